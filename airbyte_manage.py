@@ -5,14 +5,20 @@ connections, list sources, and create sources within an Airbyte instance.
 """
 
 import os
+import json
 import logging
 import asyncio
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+import time
+from typing import Optional, Dict, Any, List, Iterable, AsyncIterator, Sequence, Tuple, Type, TypeVar, get_args
+from datetime import datetime, timezone
 
 import requests
 import aiohttp
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, ValidationError, validator
+try:
+    from pydantic import TypeAdapter  # pydantic v2
+except ImportError:
+    TypeAdapter = None
 from tenacity import retry, stop_after_attempt, wait_exponential
 from dotenv import load_dotenv
 from requests.auth import HTTPBasicAuth
@@ -27,11 +33,25 @@ from opentelemetry.trace import Status, StatusCode
 from circuitbreaker import circuit
 from typing import Callable
 import aiocache
-from functools import wraps
+from functools import lru_cache, wraps
 import jwt
 import secrets
 from cryptography.fernet import Fernet
 
+try:
+    import orjson  # optional, faster JSON backend for fast_decoding
+except ImportError:
+    orjson = None
+
+from anomaly_detection import SyncMetricsStore
+from catalog import WorkspaceCatalog
+from compression import StreamingDecoder, accept_encoding, compress_body, record_transfer
+from sync_notifications import SyncNotificationHub
+from sync_scheduler import (
+    ConnectionProfile, LoadAwareScheduler, ScheduleEntry, SyncHistory,
+    parse_period_minutes,
+)
+
 # Metrics
 SYNC_DURATION = Histogram(
     'airbyte_sync_duration_seconds',
@@ -49,6 +69,21 @@ class LicenseException(Exception):
     """Exception for license validation failures"""
 
 
+class ApiRequestError(Exception):
+    """Exception for Airbyte API error responses"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _trips_circuit(exc_type, exc_value) -> bool:
+    # Client errors (unknown ids, bad input) say nothing about upstream health
+    if isinstance(exc_value, ApiRequestError):
+        return exc_value.status >= 500 or exc_value.status == 429
+    return True
+
+
 class ConnectionStatus(BaseModel):
     status: str
     last_sync: Optional[datetime]
@@ -68,6 +103,7 @@ class SyncJob:
     start_time: datetime
     end_time: Optional[datetime] = None
     records_synced: int = 0
+    error: Optional[str] = None
 
 
 class SourceSchema(BaseModel):
@@ -85,6 +121,86 @@ class SourceSchema(BaseModel):
         return v
 
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def decode_json(body: bytes) -> Any:
+    """Decode a JSON body with orjson when installed, else the stdlib."""
+    if not body:
+        return {}
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def _parse_timestamp(value: Any) -> Any:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    return value
+
+
+def build_model(
+    model_cls: Type[ModelT],
+    data: Dict[str, Any],
+    fields: Optional[Sequence[str]] = None,
+    validate: bool = True
+) -> ModelT:
+    """Build a response model, optionally projected and without validation.
+
+    With ``fields`` only the requested attributes are set, so unrequested
+    ones must not be accessed; they are still validated unless ``validate``
+    is False.
+    """
+    if fields is not None:
+        data = {name: data.get(name) for name in fields}
+        if validate:
+            construct = getattr(model_cls, "model_construct", None) or model_cls.construct
+            return construct(**_validate_fields(model_cls, data))
+    elif validate:
+        return model_cls(**data)
+    else:
+        data = {name: data.get(name) for name in _model_fields(model_cls)}
+    for name in _datetime_fields(model_cls):
+        if name in data:
+            data[name] = _parse_timestamp(data[name])
+    construct = getattr(model_cls, "model_construct", None) or model_cls.construct
+    return construct(**data)
+
+
+def _model_fields(model_cls: Type[BaseModel]) -> Iterable[str]:
+    return getattr(model_cls, "model_fields", None) or model_cls.__fields__
+
+
+@lru_cache(maxsize=None)
+def _datetime_fields(model_cls: Type[BaseModel]) -> Tuple[str, ...]:
+    """Fields annotated as datetime or Optional[datetime]."""
+    names = []
+    for name, info in _model_fields(model_cls).items():
+        # pydantic v2 FieldInfo.annotation, v1 ModelField.outer_type_
+        annotation = getattr(info, "annotation", None) or getattr(info, "outer_type_", None)
+        if annotation is datetime or datetime in get_args(annotation):
+            names.append(name)
+    return tuple(names)
+
+
+@lru_cache(maxsize=None)
+def _field_adapter(model_cls: Type[BaseModel], name: str) -> "TypeAdapter":
+    return TypeAdapter(model_cls.model_fields[name].annotation)
+
+
+def _validate_fields(model_cls: Type[BaseModel], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a subset of a model's fields; raises ValidationError like the model would."""
+    if TypeAdapter is None:
+        # pydantic v1
+        validated = {}
+        for name, value in data.items():
+            validated[name], error = model_cls.__fields__[name].validate(value, {}, loc=name)
+            if error:
+                raise ValidationError([error], model_cls)
+        return validated
+    return {name: _field_adapter(model_cls, name).validate_python(value) for name, value in data.items()}
+
+
 class PremiumFeatureException(Exception):
     """Exception for premium feature access"""
 
@@ -122,7 +238,12 @@ class AirbyteApiClient:
         rate_limit_per_second: int = 10,
         is_premium: bool = False,
         enterprise_config: Optional[Dict] = None,
-        security_config: Optional[SecurityConfig] = None
+        security_config: Optional[SecurityConfig] = None,
+        rate_limiter: Optional[Any] = None,
+        fast_decoding: bool = False,
+        webhook_timeout: Optional[float] = None,
+        request_queue: Optional[Any] = None,
+        compress_requests_over: Optional[int] = None
     ) -> None:
         self.base_url = base_url or os.getenv("AIRBYTE_BASE_URL", "https://api.airbyte.com/v1")
         self.username = username or os.getenv("BASIC_AUTH_USERNAME")
@@ -133,10 +254,32 @@ class AirbyteApiClient:
 
         self.auth = HTTPBasicAuth(self.username, self.password)
         self.logger = logging.getLogger(__name__)
+        self.max_retries = max_retries
         self.rate_limit = rate_limit_per_second
         self._last_request_time = 0
+        # Optional object with an async acquire(), e.g. a SharedRateBudget
+        self.rate_limiter = rate_limiter
+        # Optional WeightedFairQueue sharing upstream slots between tenants
+        self.request_queue = request_queue
+        # Trusted-response fast path: orjson decoding, no pydantic validation
+        self.fast_decoding = fast_decoding
+        # Completion webhooks resolve waiters here; status polling only starts
+        # once webhook_timeout passes without a notification (None: poll now)
+        self.sync_notifications = SyncNotificationHub()
+        self.webhook_timeout = webhook_timeout
         self.scheduler = BackgroundScheduler()
         self.scheduler.start()
+        self.sync_history = SyncHistory()
+        self.sync_metrics = SyncMetricsStore()
+        # sync_metrics is also fed from Airbyte's job history, so it covers
+        # syncs run elsewhere: the newest job folded in per connection, and
+        # when its history was last checked (cleared by a completion webhook)
+        self.metrics_history_ttl = 900.0
+        self._metrics_cursor: Dict[str, Optional[int]] = {}
+        self._history_checked: Dict[str, float] = {}
+        self.sync_notifications.subscribe(self._on_sync_notification)
+        # Indexed local views of workspaces, keyed by workspace id
+        self._catalogs: Dict[str, WorkspaceCatalog] = {}
 
         # Add caching
         self.cache = cachetools.TTLCache(maxsize=100, ttl=300)  # 5 minutes TTL
@@ -145,11 +288,16 @@ class AirbyteApiClient:
         # Add tracing
         self.tracer = trace.get_tracer(__name__)
 
-        # Add connection pool
+        # Add connection pool; responses are gzip/brotli negotiated and
+        # decoded by _read_body so wire bytes can be measured
         self.session = aiohttp.ClientSession(
             connector=aiohttp.TCPConnector(limit=20),
-            timeout=aiohttp.ClientTimeout(total=30)
+            timeout=aiohttp.ClientTimeout(total=30),
+            headers={"Accept-Encoding": accept_encoding()},
+            auto_decompress=False
         )
+        # Gzip JSON request bodies larger than this many bytes (None: never)
+        self.compress_requests_over = compress_requests_over
 
         self.is_premium = is_premium
         self.enterprise_config = enterprise_config or {}
@@ -165,13 +313,15 @@ class AirbyteApiClient:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        for catalog in self._catalogs.values():
+            catalog.stop_refresh()
         await self.session.close()
 
     def _cache_key(self, method: str, endpoint: str, **kwargs) -> str:
         """Generate cache key from request parameters."""
         return f"{method}:{endpoint}:{hash(str(kwargs))}"
 
-    @circuit(failure_threshold=5, recovery_timeout=60)
+    @circuit(failure_threshold=5, recovery_timeout=60, expected_exception=_trips_circuit)
     async def _make_async_request(
         self,
         method: str,
@@ -189,7 +339,7 @@ class AirbyteApiClient:
 
         with self.tracer.start_as_current_span(f"airbyte_{endpoint}") as span:
             try:
-                response = await super()._make_async_request(
+                response = await self._send_async_request(
                     method,
                     endpoint,
                     **kwargs
@@ -204,6 +354,57 @@ class AirbyteApiClient:
                 span.set_status(Status(StatusCode.ERROR), str(e))
                 raise
 
+    async def _send_async_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """Send a request over the pooled aiohttp session."""
+        if self.request_queue is not None:
+            async with self.request_queue.slot():
+                return await self._send_pooled_request(method, endpoint, **kwargs)
+        return await self._send_pooled_request(method, endpoint, **kwargs)
+
+    async def _send_pooled_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        API_REQUESTS.inc()
+        url = f"{self.base_url}/{endpoint}"
+        auth = aiohttp.BasicAuth(self.username, self.password)
+        kwargs = self._encode_request_body(kwargs)
+        async with self.session.request(method, url, auth=auth, **kwargs) as response:
+            body = await self._read_body(response)
+            if response.status >= 400:
+                raise ApiRequestError(response.status, f"API request failed: {body.decode(errors='replace')}")
+            return self._decode_body(body)
+
+    async def _read_body(self, response: aiohttp.ClientResponse, chunk_size: int = 65536) -> bytes:
+        """Read a response, decompressing chunks as they arrive."""
+        decoder = StreamingDecoder(response.headers.get("Content-Encoding"))
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(chunk_size):
+            body += decoder.feed(chunk)
+        body += decoder.flush()
+        decoder.record()
+        return bytes(body)
+
+    def _decode_body(self, body: bytes) -> Any:
+        if self.fast_decoding:
+            return decode_json(body)
+        return json.loads(body) if body else {}
+
+    def _encode_request_body(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Serialize a json= body, gzipping it above compress_requests_over."""
+        if self.compress_requests_over is None or "json" not in kwargs:
+            return kwargs
+        kwargs = dict(kwargs)
+        payload = kwargs.pop("json")
+        raw = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode()
+        body, headers = compress_body(raw, self.compress_requests_over)
+        kwargs["data"] = body
+        kwargs["headers"] = {
+            "Content-Type": "application/json",
+            **kwargs.get("headers", {}),
+            **headers
+        }
+        return kwargs
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10)
@@ -211,13 +412,26 @@ class AirbyteApiClient:
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make HTTP request with retry mechanism and rate limiting."""
         url = f"{self.base_url}/{endpoint}"
-        response = requests.request(method, url, auth=self.auth, **kwargs)
+        response = requests.request(method, url, auth=self.auth, **self._encode_request_body(kwargs))
+        self._record_sync_response(response)
 
         try:
             response.raise_for_status()
+            if self.fast_decoding:
+                return decode_json(response.content)
             return response.json() if response.content else {}
         except requests.exceptions.HTTPError as e:
-            raise Exception(f"API request failed: {response.content}") from e
+            raise ApiRequestError(response.status_code, f"API request failed: {response.content}") from e
+
+    @staticmethod
+    def _record_sync_response(response: requests.Response) -> None:
+        """Count wire bytes for a requests response (decoded transparently)."""
+        wire_length = response.headers.get("Content-Length")
+        decoded = len(response.content)
+        if response.headers.get("Content-Encoding") and wire_length is not None:
+            record_transfer("response", int(wire_length), decoded)
+        else:
+            record_transfer("response", decoded, decoded)
 
     def update_source(
         self,
@@ -238,33 +452,27 @@ class AirbyteApiClient:
             }
         )
 
-    def create_connection(
+    async def create_connection(
         self,
-        workspaceId,
-        connection_name,
-        source_id,
-        destination_id,
-        namespaceDefinition,
+        workspaceId: Optional[str] = None,
+        connection_name: Optional[str] = None,
+        source_id: Optional[str] = None,
+        destination_id: Optional[str] = None,
+        namespaceDefinition: str = "source",
         **kwargs,
-    ) -> None:
+    ) -> Dict[str, Any]:
         """Create a new connection in the Airbyte API."""
-        url = f"{self.base_url}/connections/create"
         payload = {
-            "workspaceId": workspaceId,
+            "workspaceId": self._workspace_id(workspaceId),
             "name": connection_name,
             "sourceId": source_id,
             "destinationId": destination_id,
             "namespaceDefinition": namespaceDefinition,
         }
         payload.update(kwargs)
-        auth = HTTPBasicAuth(self.username, self.password)
-        response = requests.post(url, json=payload, auth=auth)
-        if response.status_code == 200:
-            print("Connection created successfully")
-        else:
-            raise Exception(f"Failed to create connection: {response.content}")
-
-        return None
+        return await self._make_async_request(
+            "POST", "connections/create", use_cache=False, json=payload
+        )
 
     def delete_connection(self, connection_id) -> None:
         """Delete a connection in the Airbyte API."""
@@ -295,48 +503,50 @@ class AirbyteApiClient:
         else:
             raise Exception(f"Failed to list sources: {response.content}")
 
-    def create_source(
+    async def create_source(
         self,
-        name,
-        workspaceId,
-        sourceDefinitionId,
-        connectionConfiguration: dict,
+        name: str,
+        workspaceId: Optional[str] = None,
+        sourceDefinitionId: Optional[str] = None,
+        connectionConfiguration: Optional[Dict[str, Any]] = None,
         **kwargs,
-    ) -> None:
+    ) -> Dict[str, Any]:
         """Create a new source in the Airbyte API."""
-        connectionConfiguration = self.get_source_configuration()
-        url = f"{self.base_url}/sources/create"
         payload = {
-            "workspaceId": workspaceId,
+            "workspaceId": self._workspace_id(workspaceId),
             "name": name,
             "sourceDefinitionId": sourceDefinitionId,
-            "connectionConfiguration": connectionConfiguration,
+            "connectionConfiguration": connectionConfiguration or {},
         }
         payload.update(kwargs)
-        auth = HTTPBasicAuth(self.username, self.password)
-        response = requests.post(url, json=payload, auth=auth)
-
-        if response.status_code == 200:
-            print("Source created successfully")
-        else:
-            raise Exception(f"Failed to create source: {response.content}")
-
-        return None
+        return await self._make_async_request(
+            "POST", "sources/create", use_cache=False, json=payload
+        )
 
-    async def check_connection_status(self, connection_id: str) -> ConnectionStatus:
-        """Get the status of a connection including sync status."""
+    async def check_connection_status(
+        self,
+        connection_id: str,
+        fields: Optional[Sequence[str]] = None
+    ) -> ConnectionStatus:
+        """Get the status of a connection including sync status.
+
+        Pass ``fields`` (e.g. ``("status", "last_sync")``) to project the
+        response onto just those attributes; only they are validated.
+        """
         result = await self._make_async_request(
             "POST",
             "connections/get",
+            use_cache=False,
             json={"connectionId": connection_id}
         )
-        return ConnectionStatus(**result)
+        return build_model(ConnectionStatus, result, fields, validate=not self.fast_decoding)
 
     async def trigger_sync(self, connection_id: str) -> Dict[str, Any]:
         """Trigger a manual sync for a connection."""
         return await self._make_async_request(
             "POST",
             "connections/sync",
+            use_cache=False,
             json={"connectionId": connection_id}
         )
 
@@ -347,7 +557,7 @@ class AirbyteApiClient:
             "workspaces/get",
             json={"workspaceId": workspace_id}
         )
-        return WorkspaceDetails(**result)
+        return build_model(WorkspaceDetails, result, validate=not self.fast_decoding)
 
     async def list_destinations(self, workspace_id: str, limit: int = 20) -> List[Dict[str, Any]]:
         """List all destinations in a workspace."""
@@ -357,22 +567,109 @@ class AirbyteApiClient:
             json={"workspaceId": workspace_id, "limit": limit}
         )
 
-    def create_destination(
+    async def _iter_pages(
+        self,
+        endpoint: str,
+        key: str,
+        payload: Dict[str, Any],
+        page_size: int = 100,
+        id_key: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield items from a limit/offset paginated list endpoint.
+
+        Each page is streamed through the compressed transport, so only one
+        decoded page is held in memory at a time. Endpoints that ignore
+        limit/offset are detected (a page larger than ``page_size``, or one
+        repeating ids already seen) so the listing still terminates.
+        """
+        offset = 0
+        seen = set()
+        while True:
+            page = await self._make_async_request(
+                "POST",
+                endpoint,
+                use_cache=False,
+                json={**payload, "limit": page_size, "offset": offset}
+            )
+            items = page.get(key, []) if isinstance(page, dict) else page
+            batch = items
+            if id_key is not None:
+                batch = [item for item in items if item.get(id_key) not in seen]
+                if items and not batch:
+                    return  # offset ignored: the same page came back
+                seen.update(item.get(id_key) for item in batch)
+            for item in batch:
+                yield item
+            if len(items) != page_size:
+                return  # last page, or limit ignored and everything returned
+            offset += page_size
+
+    def iter_sources(self, workspace_id: str, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over every source in a workspace."""
+        return self._iter_pages(
+            "sources/list", "sources", {"workspaceId": workspace_id}, page_size, "sourceId"
+        )
+
+    def iter_destinations(self, workspace_id: str, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over every destination in a workspace."""
+        return self._iter_pages(
+            "destinations/list", "destinations", {"workspaceId": workspace_id}, page_size, "destinationId"
+        )
+
+    def iter_connections(self, workspace_id: str, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over every connection in a workspace."""
+        return self._iter_pages(
+            "connections/list", "connections", {"workspaceId": workspace_id}, page_size, "connectionId"
+        )
+
+    def _workspace_id(self, workspace_id: Optional[str] = None) -> Optional[str]:
+        return (
+            workspace_id
+            or self.enterprise_config.get("workspace_id")
+            or os.getenv("AIRBYTE_WORKSPACE_ID")
+        )
+
+    async def get_catalog(self, workspace_id: Optional[str] = None, **options) -> WorkspaceCatalog:
+        """Indexed local catalog of a workspace, loaded on first use and
+        then refreshed in the background.
+
+        Options (snapshot_path, refresh_interval, page_size) default to
+        ``enterprise_config["catalog"]``; refresh_interval=None disables
+        background refresh.
+        """
+        workspace_id = self._workspace_id(workspace_id)
+        if not workspace_id:
+            raise ValueError("A workspace id is required for the catalog")
+        catalog = self._catalogs.get(workspace_id)
+        if catalog is None:
+            catalog = self._catalogs[workspace_id] = WorkspaceCatalog(
+                self, workspace_id, **{**self.enterprise_config.get("catalog", {}), **options}
+            )
+        await catalog.ensure_loaded()
+        catalog.start_refresh()
+        return catalog
+
+    async def get_all_connections(self, workspace_id: Optional[str] = None) -> List[str]:
+        """Ids of every connection in a workspace, served from the catalog."""
+        return (await self.get_catalog(workspace_id)).connection_ids()
+
+    async def create_destination(
         self,
         name: str,
-        workspace_id: str,
-        destination_definition_id: str,
-        connection_configuration: Dict[str, Any]
+        workspace_id: Optional[str] = None,
+        destination_definition_id: Optional[str] = None,
+        connection_configuration: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Create a new destination."""
-        return self._make_request(
+        return await self._make_async_request(
             "POST",
             "destinations/create",
+            use_cache=False,
             json={
                 "name": name,
-                "workspaceId": workspace_id,
+                "workspaceId": self._workspace_id(workspace_id),
                 "destinationDefinitionId": destination_definition_id,
-                "connectionConfiguration": connection_configuration
+                "connectionConfiguration": connection_configuration or {}
             }
         )
 
@@ -405,16 +702,141 @@ class AirbyteApiClient:
             batch_size=max_concurrent
         )
 
+    async def iter_bulk_sync(
+        self,
+        connection_ids: Iterable[str],
+        max_concurrent: int = 5
+    ) -> AsyncIterator[SyncJob]:
+        """Stream sync jobs as they finish, keeping at most max_concurrent in flight.
+
+        Ids are pulled from the iterable only when a slot frees up, so very
+        large (or unbounded) inputs are never materialized in memory.
+        """
+        ids = iter(connection_ids)
+        pending = set()
+
+        def fill() -> None:
+            while len(pending) < max_concurrent:
+                connection_id = next(ids, None)
+                if connection_id is None:
+                    return
+                pending.add(asyncio.ensure_future(self._run_sync_job(connection_id)))
+
+        fill()
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+                fill()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def sharded_bulk_sync(
+        self,
+        connection_ids: List[str],
+        processes: Optional[int] = None,
+        max_concurrent: int = 5
+    ) -> List[SyncJob]:
+        """Bulk sync across a process pool, returning jobs in input order.
+
+        Each worker process runs its own event loop and client with
+        max_concurrent syncs in flight; together they share this client's
+        rate_limit as a single request budget.
+        """
+        from sharded_sync import NotificationRouter, iter_sharded_bulk_sync
+
+        # Webhooks published to this client resolve the workers' waiters
+        router = NotificationRouter()
+        self.sync_notifications.subscribe(router.publish)
+        try:
+            jobs = await asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: {
+                    job.connection_id: job
+                    for job in iter_sharded_bulk_sync(
+                        connection_ids,
+                        processes=processes,
+                        max_concurrent=max_concurrent,
+                        rate_limit_per_second=self.rate_limit,
+                        client_kwargs=self._process_options(),
+                        router=router
+                    )
+                }
+            )
+        finally:
+            self.sync_notifications.unsubscribe(router.publish)
+        return [jobs[connection_id] for connection_id in connection_ids]
+
+    def _process_options(self) -> Dict[str, Any]:
+        """Constructor options for an equivalent client in another process.
+
+        rate_limiter and request_queue hold process-local state and are
+        left out; shard workers share a SharedRateBudget instead.
+        """
+        return {
+            "base_url": self.base_url,
+            "username": self.username,
+            "password": self.password,
+            "max_retries": self.max_retries,
+            "rate_limit_per_second": self.rate_limit,
+            "is_premium": self.is_premium,
+            "enterprise_config": self.enterprise_config,
+            "security_config": self.security_config,
+            "fast_decoding": self.fast_decoding,
+            "webhook_timeout": self.webhook_timeout,
+            "compress_requests_over": self.compress_requests_over,
+        }
+
+    async def _run_sync_job(self, connection_id: str) -> SyncJob:
+        """Run one sync, turning failures into an errored SyncJob."""
+        start_time = datetime.utcnow()
+        try:
+            return await self._sync_and_monitor(connection_id)
+        except Exception as e:
+            self.logger.error(f"Sync failed for {connection_id}: {str(e)}")
+            return SyncJob(
+                connection_id=connection_id,
+                status="ERROR",
+                start_time=start_time,
+                end_time=datetime.utcnow(),
+                error=str(e)
+            )
+
+    async def _sync_and_monitor(self, connection_id: str) -> SyncJob:
+        """Trigger a sync and wait for it to reach a terminal status."""
+        job = SyncJob(
+            connection_id=connection_id,
+            status="RUNNING",
+            start_time=datetime.utcnow()
+        )
+        triggered = await self.trigger_sync(connection_id)
+        job_id = (triggered.get("job") or {}).get("id", triggered.get("jobId"))
+        with SYNC_DURATION.time():
+            result = await self._wait_for_sync_completion(
+                connection_id, job_id=job_id, since=job.start_time
+            )
+        job.status = result["status"]
+        job.end_time = datetime.utcnow()
+        job.records_synced = (result.get("latest_status") or {}).get("recordsSynced", 0)
+        self.sync_history.observe_job(job)
+        if connection_id in self._metrics_cursor:
+            # Fold it in from the job history, in order and exactly once
+            self._history_checked.pop(connection_id, None)
+        else:
+            self.sync_metrics.update_job(job)
+        return job
+
     async def export_connection_configs(self, workspace_id: str, output_file: str):
         """Export all connection configurations to YAML."""
-        sources = await self.list_sources(workspace_id)
-        destinations = await self.list_destinations(workspace_id)
-
         config = {
             'workspace_id': workspace_id,
-            'sources': sources,
-            'destinations': destinations,
-            'connections': []
+            'sources': [s async for s in self.iter_sources(workspace_id)],
+            'destinations': [d async for d in self.iter_destinations(workspace_id)],
+            'connections': [c async for c in self.iter_connections(workspace_id)]
         }
 
         with open(output_file, 'w') as f:
@@ -433,31 +855,219 @@ class AirbyteApiClient:
         ])
 
     @retry(stop=stop_after_attempt(3))
-    async def _wait_for_sync_completion(self, connection_id: str) -> Dict[str, Any]:
-        """Wait for a sync job to complete and return its status."""
-        while True:
-            status = await self.check_connection_status(connection_id)
-            if status.status in ['SUCCEEDED', 'FAILED']:
-                return status.dict()
-            await asyncio.sleep(10)
+    async def _wait_for_sync_completion(
+        self,
+        connection_id: str,
+        job_id: Optional[Any] = None,
+        since: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Wait for a sync job to complete and return its status.
+
+        A completion webhook resolves the wait immediately; polling starts
+        only if none arrives within webhook_timeout.
+        """
+        notification = self.sync_notifications.register(connection_id, job_id, since)
+        try:
+            if self.webhook_timeout:
+                try:
+                    return (await asyncio.wait_for(
+                        asyncio.shield(notification), self.webhook_timeout
+                    )).as_status()
+                except asyncio.TimeoutError:
+                    self.logger.info(f"No completion webhook for {connection_id}, polling")
+
+            fields = ("status", "latest_status")
+            while True:
+                status = await self.check_connection_status(connection_id, fields)
+                if status.status in ['SUCCEEDED', 'FAILED']:
+                    return {field: getattr(status, field) for field in fields}
+                try:
+                    return (await asyncio.wait_for(asyncio.shield(notification), 10)).as_status()
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.sync_notifications.unregister(connection_id, notification)
 
     @premium_feature
-    async def advanced_monitoring(self) -> Dict[str, Any]:
+    async def advanced_monitoring(self, connection_ids: Optional[List[str]] = None) -> Dict[str, Any]:
         """Premium feature: Advanced monitoring with ML-based anomaly detection"""
-        metrics = await self._collect_advanced_metrics()
+        metrics = await self._collect_advanced_metrics(connection_ids)
         anomalies = self._detect_anomalies(metrics)
         return {
+            "records_synced": metrics["records_synced"],
             "metrics": metrics,
             "anomalies": anomalies
         }
 
+    async def _collect_advanced_metrics(self, connection_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Summarize the streaming per-connection sync statistics.
+
+        Scoped connections are first brought up to date from their job
+        history when it was not checked within metrics_history_ttl, or a
+        completion webhook has arrived for them since.
+        """
+        if connection_ids is not None:
+            now = time.monotonic()
+            due = [
+                c for c in connection_ids
+                if c not in self._history_checked
+                or now - self._history_checked[c] > self.metrics_history_ttl
+            ]
+            for connection_id, error in zip(due, await self.batch_operation(self._fold_job_history, due)):
+                if isinstance(error, Exception):
+                    self.logger.warning(f"No job history for {connection_id}: {str(error)}")
+        return self.sync_metrics.summary(connection_ids)
+
+    async def _fold_job_history(self, connection_id: str) -> None:
+        """Fold syncs newer than the connection's cursor into sync_metrics."""
+        cursor = self._metrics_cursor.get(connection_id)
+        for job_id, duration, records in await self._job_history(connection_id):
+            if cursor is not None and job_id <= cursor:
+                continue
+            self.sync_metrics.update(connection_id, duration, records)
+            cursor = job_id
+        self._metrics_cursor[connection_id] = cursor
+        self._history_checked[connection_id] = time.monotonic()
+
+    def _on_sync_notification(self, notification) -> None:
+        # A sync finished, possibly outside this process: re-read its history
+        self._history_checked.pop(notification.connection_id, None)
+
+    def _detect_anomalies(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Score the latest sync of each connection covered by metrics."""
+        scope = metrics.get("per_connection")
+        return self.sync_metrics.detect(list(scope) if scope is not None else None)
+
     @premium_feature
-    async def auto_optimization(self) -> Dict[str, Any]:
-        """Premium feature: Automatic optimization of sync schedules"""
-        current_schedules = await self._analyze_sync_patterns()
+    async def auto_optimization(
+        self,
+        workspace_id: Optional[str] = None,
+        apply: bool = False
+    ) -> Dict[str, Any]:
+        """Premium feature: Automatic optimization of sync schedules
+
+        Returns the staggered schedule plan; with apply=True the connections
+        are also switched to the planned cron schedules.
+        """
+        current_schedules = await self._analyze_sync_patterns(workspace_id)
         optimized_schedules = self._optimize_schedules(current_schedules)
+        if apply:
+            await self._apply_schedules(optimized_schedules)
         return optimized_schedules
 
+    def schedule_auto_optimization(self, interval_hours: int = 24, **kwargs) -> None:
+        """Re-run auto_optimization periodically on the background scheduler."""
+        loop = asyncio.get_running_loop()
+        self.scheduler.add_job(
+            lambda: asyncio.run_coroutine_threadsafe(
+                self.auto_optimization(**kwargs), loop
+            ).add_done_callback(self._log_scheduled_failure),
+            "interval",
+            hours=interval_hours,
+            id="auto_optimization",
+            replace_existing=True
+        )
+
+    def _log_scheduled_failure(self, future) -> None:
+        """Report a failed scheduled run; nothing else awaits its future."""
+        if future.cancelled():
+            return
+        e = future.exception()
+        if e is not None:
+            self.logger.error(f"Scheduled auto-optimization failed: {str(e)}", exc_info=e)
+
+    def _schedule_optimizer(self) -> LoadAwareScheduler:
+        return LoadAwareScheduler(**self.enterprise_config.get("scheduler", {}))
+
+    async def _job_history(self, connection_id: str) -> List[Tuple[int, float, int]]:
+        """(job id, duration, records) of a connection's recent successful
+        syncs, oldest first."""
+        result = await self._make_async_request(
+            "POST",
+            "jobs/list",
+            use_cache=False,
+            json={
+                "configTypes": ["sync"],
+                "configId": connection_id,
+                "pagination": {"pageSize": 20}
+            }
+        )
+        history = []
+        for entry in result.get("jobs", []):
+            job = entry.get("job", {})
+            if job.get("status") != "succeeded":
+                continue
+            records = sum(
+                a.get("attempt", a).get("recordsSynced", 0)
+                for a in entry.get("attempts", [])
+            )
+            history.append((int(job["id"]), job["updatedAt"] - job["createdAt"], records))
+        return sorted(history)
+
+    async def _fetch_sync_history(self, connection_id: str) -> None:
+        """Seed sync_history from a connection's recent successful jobs."""
+        for _, duration, records in await self._job_history(connection_id):
+            self.sync_history.observe(connection_id, duration, records)
+
+    async def _analyze_sync_patterns(self, workspace_id: Optional[str] = None) -> List[ConnectionProfile]:
+        """Build a duration/volume profile for every scheduled connection."""
+        workspace_id = self._workspace_id(workspace_id)
+        result = await self._make_async_request(
+            "POST",
+            "connections/list",
+            use_cache=False,
+            json={"workspaceId": workspace_id}
+        )
+        scheduled = {}
+        for connection in result.get("connections", []):
+            if connection.get("status", "active") != "active":
+                continue
+            period = parse_period_minutes(connection)
+            if period is not None:
+                scheduled[connection["connectionId"]] = period
+
+        unseen = [c for c in scheduled if c not in self.sync_history]
+        for connection_id, error in zip(
+            unseen, await self.batch_operation(self._fetch_sync_history, unseen)
+        ):
+            if isinstance(error, Exception):
+                self.logger.warning(f"No job history for {connection_id}: {str(error)}")
+
+        default_duration = self._schedule_optimizer().default_duration
+        profiles = []
+        for connection_id, period in scheduled.items():
+            duration, records, samples = self.sync_history.get(connection_id) or (default_duration, 0.0, 0)
+            profiles.append(ConnectionProfile(connection_id, period, duration, records, samples))
+        return profiles
+
+    def _optimize_schedules(self, current_schedules: List[ConnectionProfile]) -> Dict[str, Any]:
+        """Stagger start offsets under the configured load caps."""
+        return self._schedule_optimizer().plan(current_schedules)
+
+    async def _apply_schedules(self, plan: Dict[str, Any]) -> None:
+        """Switch each planned connection to its staggered cron schedule."""
+        async def update(entry: Dict[str, Any]) -> Dict[str, Any]:
+            return await self._make_async_request(
+                "POST",
+                "connections/update",
+                use_cache=False,
+                json={
+                    "connectionId": entry["connection_id"],
+                    "scheduleType": "cron",
+                    "scheduleData": ScheduleEntry(**entry).schedule_data()
+                }
+            )
+
+        results = await self.batch_operation(update, plan["schedules"])
+        failed = [
+            entry["connection_id"]
+            for entry, result in zip(plan["schedules"], results)
+            if isinstance(result, Exception)
+        ]
+        plan["applied"] = len(plan["schedules"]) - len(failed)
+        plan["failed"] = failed
+        self._audit_log("schedules_optimized", {"applied": plan["applied"], "failed": failed})
+
     def _verify_license(self) -> bool:
         """Verify the license key and features"""
         if not self.security_config.license_key:
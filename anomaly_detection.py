@@ -0,0 +1,176 @@
+"""
+Streaming per-connection sync statistics and anomaly scoring. Every
+completed sync updates fixed-size NumPy rows in O(1): EWMA mean/variance,
+a ring buffer for robust median/MAD, and fast/slow records-per-second
+averages for drift. Scoring all connections is one vectorized pass.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+METRICS = ("duration", "records", "records_per_second")
+
+# Scales MAD to a standard deviation for normally distributed data
+_MAD_SCALE = 0.6745
+
+
+class SyncMetricsStore:
+    """Compact, array-backed incremental statistics indexed by connection."""
+
+    def __init__(
+        self,
+        alpha: float = 0.1,
+        drift_alpha: float = 0.01,
+        window: int = 32,
+        capacity: int = 1024
+    ):
+        self.alpha = alpha
+        self.drift_alpha = drift_alpha
+        self.window = window
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        width = len(METRICS)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.records_total = np.zeros(capacity, dtype=np.float64)
+        self.last = np.zeros((capacity, width), dtype=np.float64)
+        self.mean = np.zeros((capacity, width), dtype=np.float64)
+        self.var = np.zeros((capacity, width), dtype=np.float64)
+        self.ewma_z = np.zeros((capacity, width), dtype=np.float64)
+        self.slow_rps = np.zeros(capacity, dtype=np.float64)
+        self.ring = np.full((capacity, self.window, width), np.nan, dtype=np.float32)
+
+    def _grow(self) -> None:
+        old = {name: getattr(self, name) for name in (
+            "count", "records_total", "last", "mean", "var", "ewma_z", "slow_rps", "ring"
+        )}
+        self._allocate(len(old["count"]) * 2)
+        for name, values in old.items():
+            getattr(self, name)[:len(values)] = values
+
+    def _row(self, connection_id: str) -> int:
+        row = self._index.get(connection_id)
+        if row is None:
+            row = len(self._ids)
+            if row == len(self.count):
+                self._grow()
+            self._index[connection_id] = row
+            self._ids.append(connection_id)
+        return row
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, connection_id: str) -> bool:
+        return connection_id in self._index
+
+    def update(self, connection_id: str, duration: float, records: float) -> None:
+        """Fold one completed sync into the connection's statistics."""
+        row = self._row(connection_id)
+        x = np.array([duration, records, records / duration if duration > 0 else 0.0])
+        n = self.count[row]
+
+        if n == 0:
+            self.mean[row] = x
+            self.slow_rps[row] = x[2]
+        else:
+            # Score against the prior state, then do the EWMA update
+            std = np.sqrt(self.var[row])
+            diff = x - self.mean[row]
+            self.ewma_z[row] = np.divide(diff, std, out=np.zeros_like(diff), where=std > 0)
+            increment = self.alpha * diff
+            self.mean[row] += increment
+            self.var[row] = (1 - self.alpha) * (self.var[row] + diff * increment)
+            self.slow_rps[row] += self.drift_alpha * (x[2] - self.slow_rps[row])
+
+        self.ring[row, n % self.window] = x
+        self.last[row] = x
+        self.count[row] = n + 1
+        self.records_total[row] += records
+
+    def update_job(self, job) -> None:
+        """Fold a finished ``SyncJob`` into the statistics."""
+        if job.end_time is None or job.error is not None:
+            return
+        duration = (job.end_time - job.start_time).total_seconds()
+        self.update(job.connection_id, duration, job.records_synced)
+
+    def _rows(self, connection_ids: Optional[Iterable[str]]) -> np.ndarray:
+        if connection_ids is None:
+            return np.arange(len(self._ids))
+        return np.array(
+            [self._index[c] for c in connection_ids if c in self._index],
+            dtype=np.int64
+        )
+
+    def summary(self, connection_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Aggregate metrics, with per-connection detail when scoped."""
+        rows = self._rows(connection_ids)
+        result: Dict[str, Any] = {
+            "connections": int(len(rows)),
+            "syncs_observed": int(self.count[rows].sum()),
+            "records_synced": int(self.records_total[rows].sum()),
+        }
+        if connection_ids is not None:
+            result["per_connection"] = {
+                self._ids[row]: {
+                    "syncs": int(self.count[row]),
+                    "records_synced": int(self.records_total[row]),
+                    **{f"mean_{m}": float(self.mean[row, i]) for i, m in enumerate(METRICS)},
+                    **{f"last_{m}": float(self.last[row, i]) for i, m in enumerate(METRICS)},
+                }
+                for row in rows
+            }
+        return result
+
+    def detect(
+        self,
+        connection_ids: Optional[Iterable[str]] = None,
+        z_threshold: float = 3.5,
+        robust_threshold: float = 3.5,
+        drift_threshold: float = 0.5,
+        min_samples: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Score the latest sync of every connection in one vectorized pass."""
+        rows = self._rows(connection_ids)
+        rows = rows[self.count[rows] >= min_samples]
+        if len(rows) == 0:
+            return []
+
+        window = self.ring[rows]
+        median = np.nanmedian(window, axis=1)
+        mad = np.nanmedian(np.abs(window - median[:, None, :]), axis=1)
+        last = self.last[rows]
+        robust_z = np.divide(
+            _MAD_SCALE * (last - median), mad,
+            out=np.zeros_like(last), where=mad > 0
+        )
+        ewma_z = self.ewma_z[rows]
+        drift = np.divide(
+            self.mean[rows, 2] - self.slow_rps[rows], self.slow_rps[rows],
+            out=np.zeros(len(rows)), where=self.slow_rps[rows] > 0
+        )
+
+        flagged = (np.abs(ewma_z) > z_threshold) & (np.abs(robust_z) > robust_threshold)
+        anomalies = []
+        for r, m in zip(*np.nonzero(flagged)):
+            anomalies.append({
+                "connection_id": self._ids[rows[r]],
+                "metric": METRICS[m],
+                "value": float(last[r, m]),
+                "expected": float(median[r, m]),
+                "ewma_z": float(ewma_z[r, m]),
+                "robust_z": float(robust_z[r, m]),
+            })
+        for r in np.nonzero(np.abs(drift) > drift_threshold)[0]:
+            anomalies.append({
+                "connection_id": self._ids[rows[r]],
+                "metric": "records_per_second_drift",
+                "value": float(self.mean[rows[r], 2]),
+                "expected": float(self.slow_rps[rows[r]]),
+                "drift": float(drift[r]),
+            })
+        return anomalies
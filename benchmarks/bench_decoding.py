@@ -0,0 +1,67 @@
+"""
+Per-response decoding cost for connection status polls: stdlib JSON plus a
+validated ConnectionStatus versus the fast path (orjson when installed,
+unvalidated construction, optional projection onto status/last_sync).
+
+    python benchmarks/bench_decoding.py [--streams 50] [--number 20000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from airbyte_manage import ConnectionStatus, build_model, decode_json, orjson  # noqa: E402
+
+
+def make_payload(streams: int) -> bytes:
+    """A connections/get style response with a sync catalog of ``streams``."""
+    return json.dumps({
+        "connectionId": "c0ffee00-0000-0000-0000-000000000000",
+        "status": "RUNNING",
+        "last_sync": "2024-01-01T00:00:00Z",
+        "latest_status": {"jobId": 42, "recordsSynced": 123456, "bytesSynced": 9876543},
+        "syncCatalog": {"streams": [
+            {
+                "stream": {
+                    "name": f"table_{i}",
+                    "jsonSchema": {"properties": {f"col_{c}": {"type": "string"} for c in range(20)}},
+                    "supportedSyncModes": ["full_refresh", "incremental"],
+                },
+                "config": {"syncMode": "incremental", "destinationSyncMode": "append_dedup", "selected": True},
+            }
+            for i in range(streams)
+        ]},
+    }).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--streams", type=int, default=50)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    body = make_payload(args.streams)
+    cases = {
+        "stdlib json + validated model": lambda: ConnectionStatus(**json.loads(body)),
+        "fast decode + unvalidated model": lambda: build_model(
+            ConnectionStatus, decode_json(body), validate=False
+        ),
+        "fast decode + status/last_sync projection": lambda: build_model(
+            ConnectionStatus, decode_json(body), fields=("status", "last_sync")
+        ),
+    }
+
+    print(f"payload {len(body)} bytes, JSON backend: {'orjson' if orjson else 'stdlib'}")
+    baseline = None
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=args.number, repeat=3)) / args.number
+        baseline = baseline or seconds
+        print(f"{name:45s} {seconds * 1e6:8.2f} us/response  {baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
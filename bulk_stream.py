@@ -0,0 +1,176 @@
+"""
+Streaming input, result sinks and checkpoints for large bulk sync runs.
+Connection ids are read lazily from YAML, JSON or JSONL (file or stdin), results
+are appended to a JSONL sink as each job finishes, and a checkpoint file
+records finished connections so an interrupted run can resume.
+"""
+
+import json
+import os
+import sys
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, TextIO
+
+import yaml
+
+from airbyte_manage import SyncJob
+
+
+def _open_input(path: str) -> TextIO:
+    return sys.stdin if path == "-" else open(path)
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """Resolve the input format from an explicit value or the file extension."""
+    if fmt:
+        return fmt
+    if path.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if path.endswith(".json"):
+        return "json"
+    return "yaml"
+
+
+def _connection_id(entry: Any) -> Optional[str]:
+    if isinstance(entry, str):
+        return entry.strip() or None
+    if isinstance(entry, dict):
+        return entry.get("connection_id") or entry.get("connectionId")
+    return None
+
+
+def _iter_jsonl(stream: TextIO) -> Iterator[str]:
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(("{", "[", '"')):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Malformed JSONL on line {line_no}: {e}") from None
+        else:
+            entry = line  # bare connection id
+        connection_id = _connection_id(entry)
+        if connection_id:
+            yield connection_id
+
+
+def _iter_document(document: Any) -> Iterator[str]:
+    # A document may be the classic ``{connections: [...]}`` mapping,
+    # a plain list, or a single id.
+    if isinstance(document, dict) and "connections" in document:
+        entries = document["connections"] or []
+    elif isinstance(document, list):
+        entries = document
+    else:
+        entries = [document]
+    for entry in entries:
+        connection_id = _connection_id(entry)
+        if connection_id:
+            yield connection_id
+
+
+def _iter_yaml(stream: TextIO) -> Iterator[str]:
+    # Multi-document streams yield each document's ids in turn
+    for document in yaml.safe_load_all(stream):
+        yield from _iter_document(document)
+
+
+def _iter_json(stream: TextIO) -> Iterator[str]:
+    try:
+        document = json.load(stream)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Malformed JSON: {e}") from None
+    yield from _iter_document(document)
+
+
+def read_connection_ids(path: str, fmt: Optional[str] = None) -> Iterator[str]:
+    """Lazily yield connection ids from a YAML, JSON or JSONL file, or ``-`` for stdin."""
+    fmt = detect_format(path, fmt)
+    stream = _open_input(path)
+    try:
+        reader = {"jsonl": _iter_jsonl, "json": _iter_json}.get(fmt, _iter_yaml)
+        yield from reader(stream)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def count_entries(path: str, fmt: Optional[str] = None) -> Optional[int]:
+    """Cheaply count non-empty JSONL lines; ``None`` when the total is unknown."""
+    if path == "-" or detect_format(path, fmt) != "jsonl":
+        return None
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def job_to_record(job: SyncJob) -> Dict[str, Any]:
+    """Serialize a ``SyncJob`` into a JSON-compatible dict."""
+    record = asdict(job)
+    for key in ("start_time", "end_time"):
+        if isinstance(record[key], datetime):
+            record[key] = record[key].isoformat()
+    if job.end_time is not None:
+        record["duration"] = (job.end_time - job.start_time).total_seconds()
+    return record
+
+
+class JsonlSink:
+    """Append-only JSONL writer flushed after every record."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = sys.stdout if path == "-" else open(path, "a")
+
+    def write(self, job: SyncJob) -> None:
+        self._file.write(json.dumps(job_to_record(job)) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not sys.stdout:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SyncCheckpoint:
+    """Records finished connection ids so an interrupted run can resume."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed: Set[str] = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.completed.update(line.strip() for line in f if line.strip())
+        self._file = open(path, "a")
+
+    def __contains__(self, connection_id: str) -> bool:
+        return connection_id in self.completed
+
+    def pending(self, connection_ids: Iterable[str]) -> Iterator[str]:
+        """Filter out connections finished by a previous run."""
+        return (c for c in connection_ids if c not in self.completed)
+
+    def mark(self, job: SyncJob) -> None:
+        """Record a finished job; errored jobs are left for the next run."""
+        if job.error is not None or job.connection_id in self.completed:
+            return
+        self.completed.add(job.connection_id)
+        self._file.write(job.connection_id + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
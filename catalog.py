@@ -0,0 +1,298 @@
+"""
+Local, indexed view of a workspace's sources, destinations and connections.
+Lookups by id, name, definition and source/destination relationship are
+dictionary reads with no upstream call. A background task re-lists the
+workspace and applies only what changed, and the catalog can be
+snapshotted to disk so short-lived processes start warm.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Per kind: id field, then index name -> candidate fields (first present wins)
+KINDS: Dict[str, Tuple[str, Dict[str, Tuple[str, ...]]]] = {
+    "sources": ("sourceId", {
+        "name": ("name",),
+        "definition": ("sourceDefinitionId", "definitionId"),
+    }),
+    "destinations": ("destinationId", {
+        "name": ("name",),
+        "definition": ("destinationDefinitionId", "definitionId"),
+    }),
+    "connections": ("connectionId", {
+        "name": ("name",),
+        "source": ("sourceId",),
+        "destination": ("destinationId",),
+    }),
+}
+
+SNAPSHOT_VERSION = 1
+
+
+def _fingerprint(item: Dict[str, Any]) -> str:
+    return hashlib.blake2b(
+        json.dumps(item, sort_keys=True, default=str).encode(), digest_size=16
+    ).hexdigest()
+
+
+class _Table:
+    """Objects of one kind plus their secondary indexes."""
+
+    def __init__(self, id_key: str, index_fields: Dict[str, Tuple[str, ...]]):
+        self.id_key = id_key
+        self.index_fields = index_fields
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.fingerprints: Dict[str, str] = {}
+        self.indexes: Dict[str, Dict[Any, Set[str]]] = {
+            name: defaultdict(set) for name in index_fields
+        }
+
+    def _keys(self, item: Dict[str, Any]):
+        for name, fields in self.index_fields.items():
+            value = next((item[f] for f in fields if item.get(f) is not None), None)
+            if value is not None:
+                yield name, value
+
+    def _unindex(self, object_id: str) -> None:
+        for name, value in self._keys(self.items[object_id]):
+            ids = self.indexes[name][value]
+            ids.discard(object_id)
+            if not ids:
+                del self.indexes[name][value]
+
+    def upsert(self, item: Dict[str, Any]) -> Optional[str]:
+        """Insert or replace an object; returns "added", "updated" or None if unchanged."""
+        object_id = item[self.id_key]
+        fingerprint = _fingerprint(item)
+        previous = self.fingerprints.get(object_id)
+        if previous == fingerprint:
+            return None
+        if previous is not None:
+            self._unindex(object_id)
+        self.items[object_id] = item
+        self.fingerprints[object_id] = fingerprint
+        for name, value in self._keys(item):
+            self.indexes[name][value].add(object_id)
+        return "updated" if previous is not None else "added"
+
+    def remove(self, object_id: str) -> bool:
+        if object_id not in self.items:
+            return False
+        self._unindex(object_id)
+        del self.items[object_id]
+        del self.fingerprints[object_id]
+        return True
+
+    def lookup(self, index: str, value: Any) -> Set[str]:
+        return self.indexes[index].get(value, set())
+
+
+class WorkspaceCatalog:
+    """In-memory, indexed catalog of one workspace's objects."""
+
+    def __init__(
+        self,
+        client,
+        workspace_id: str,
+        snapshot_path: Optional[str] = None,
+        refresh_interval: Optional[float] = 300.0,
+        page_size: int = 100
+    ):
+        self.client = client
+        self.workspace_id = workspace_id
+        self.snapshot_path = snapshot_path
+        self.refresh_interval = refresh_interval
+        self.page_size = page_size
+        self.refreshed_at: Optional[datetime] = None
+        self.logger = logging.getLogger(__name__)
+        self._tables = {kind: _Table(id_key, fields) for kind, (id_key, fields) in KINDS.items()}
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return sum(len(t.items) for t in self._tables.values())
+
+    # Lookups
+
+    def get(self, kind: str, object_id: str) -> Optional[Dict[str, Any]]:
+        return self._tables[kind].items.get(object_id)
+
+    def source(self, source_id: str) -> Optional[Dict[str, Any]]:
+        return self.get("sources", source_id)
+
+    def destination(self, destination_id: str) -> Optional[Dict[str, Any]]:
+        return self.get("destinations", destination_id)
+
+    def connection(self, connection_id: str) -> Optional[Dict[str, Any]]:
+        return self.get("connections", connection_id)
+
+    def find(self, kind: str, **filters: Any) -> List[Dict[str, Any]]:
+        """Objects of ``kind`` matching every given index, e.g. ``name=`` or ``definition=``."""
+        table = self._tables[kind]
+        unknown = set(filters) - set(table.indexes)
+        if unknown:
+            raise ValueError(f"No {kind} index for: {', '.join(sorted(unknown))}")
+        if not filters:
+            return list(table.items.values())
+        # Intersect starting from the most selective index
+        matches = sorted((table.lookup(i, v) for i, v in filters.items()), key=len)
+        ids = set(matches[0]).intersection(*matches[1:])
+        return [table.items[i] for i in sorted(ids)]
+
+    def connections_for_source(self, source_id: str) -> List[Dict[str, Any]]:
+        return self.find("connections", source=source_id)
+
+    def connections_for_destination(self, destination_id: str) -> List[Dict[str, Any]]:
+        return self.find("connections", destination=destination_id)
+
+    def connections_for_definition(self, definition_id: str) -> List[Dict[str, Any]]:
+        """Connections whose source or destination uses a connector definition."""
+        connections = self._tables["connections"]
+        ids: Set[str] = set()
+        for kind, relation in (("sources", "source"), ("destinations", "destination")):
+            for object_id in self._tables[kind].lookup("definition", definition_id):
+                ids |= connections.lookup(relation, object_id)
+        return [connections.items[i] for i in sorted(ids)]
+
+    def find_connections(self, definition: Optional[str] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Connections matching every given index and, optionally, a connector definition."""
+        if definition is None:
+            return self.find("connections", **filters)
+        by_definition = self.connections_for_definition(definition)
+        if not filters:
+            return by_definition
+        ids = {c["connectionId"] for c in self.find("connections", **filters)}
+        return [c for c in by_definition if c["connectionId"] in ids]
+
+    def connection_ids(self) -> List[str]:
+        return list(self._tables["connections"].items)
+
+    # Updates
+
+    def upsert(self, kind: str, item: Dict[str, Any]) -> Optional[str]:
+        """Apply one object, e.g. right after creating it."""
+        return self._tables[kind].upsert(item)
+
+    def remove(self, kind: str, object_id: str) -> bool:
+        return self._tables[kind].remove(object_id)
+
+    def _listing(self, kind: str):
+        return getattr(self.client, f"iter_{kind}")(self.workspace_id, page_size=self.page_size)
+
+    async def refresh(self) -> Dict[str, Dict[str, int]]:
+        """Re-list the workspace, applying only added, changed and removed objects.
+
+        Pages are applied as they arrive. A listing that fails part way
+        raises before anything is removed, so lookups never see a gap.
+        """
+        async with self._refresh_lock:
+            changes = {}
+            for kind, table in self._tables.items():
+                counts = {"added": 0, "updated": 0, "removed": 0}
+                seen = set()
+                async for item in self._listing(kind):
+                    seen.add(item[table.id_key])
+                    change = table.upsert(item)
+                    if change:
+                        counts[change] += 1
+                for object_id in set(table.items) - seen:
+                    table.remove(object_id)
+                    counts["removed"] += 1
+                changes[kind] = counts
+            self.refreshed_at = datetime.utcnow()
+            return changes
+
+    async def ensure_loaded(self) -> "WorkspaceCatalog":
+        """Populate from the snapshot, or from the API when there is none."""
+        if self.refreshed_at is None and not self.load_snapshot():
+            await self.refresh()
+            if self.snapshot_path:
+                await self.write_snapshot()
+        return self
+
+    # Snapshots
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "workspace_id": self.workspace_id,
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+            **{kind: list(table.items.values()) for kind, table in self._tables.items()},
+        }
+
+    @staticmethod
+    def _write_file(path: str, data: bytes) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def save_snapshot(self, path: Optional[str] = None) -> None:
+        """Atomically write the catalog to ``path`` (default: snapshot_path)."""
+        self._write_file(path or self.snapshot_path, json.dumps(self.snapshot(), default=str).encode())
+
+    async def write_snapshot(self, path: Optional[str] = None) -> None:
+        """Like save_snapshot, with the file write off the event loop."""
+        data = json.dumps(self.snapshot(), default=str).encode()
+        await asyncio.to_thread(self._write_file, path or self.snapshot_path, data)
+
+    def load_snapshot(self, path: Optional[str] = None) -> bool:
+        """Replace the catalog with a snapshot; False if none usable exists."""
+        path = path or self.snapshot_path
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable catalog snapshot {path}: {str(e)}")
+            return False
+        if data.get("version") != SNAPSHOT_VERSION or data.get("workspace_id") != self.workspace_id:
+            return False
+
+        self._tables = {kind: _Table(id_key, fields) for kind, (id_key, fields) in KINDS.items()}
+        for kind, table in self._tables.items():
+            for item in data.get(kind, []):
+                table.upsert(item)
+        refreshed_at = data.get("refreshed_at")
+        self.refreshed_at = datetime.fromisoformat(refreshed_at) if refreshed_at else datetime.utcnow()
+        return True
+
+    # Background refresh
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                changes = await self.refresh()
+                if self.snapshot_path and any(any(c.values()) for c in changes.values()):
+                    await self.write_snapshot()
+            except Exception as e:
+                self.logger.error(f"Catalog refresh failed: {str(e)}")
+
+    def start_refresh(self) -> None:
+        """Keep the catalog up to date in the background (unless refresh_interval is None)"""
+        if not self.refresh_interval:
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    def stop_refresh(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workspace_id": self.workspace_id,
+            "refreshed_at": self.refreshed_at,
+            **{kind: len(table.items) for kind, table in self._tables.items()},
+        }
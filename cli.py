@@ -1,43 +1,279 @@
 import click
 import asyncio
-import yaml
+import json
+from collections import Counter
+from contextlib import AsyncExitStack, ExitStack
+from typing import Any, Dict, Optional
 from rich.console import Console
 from rich.table import Table
+from rich.progress import (
+    Progress, ProgressColumn, SpinnerColumn, TextColumn, BarColumn,
+    MofNCompleteColumn, TimeElapsedColumn, TimeRemainingColumn,
+)
+from rich.text import Text
 from airbyte_manage import AirbyteApiClient
+from bulk_stream import read_connection_ids, count_entries, JsonlSink, SyncCheckpoint
+from sharded_sync import iter_sharded_bulk_sync, NotificationRouter, SharedRateBudget
+from sync_notifications import WebhookEmitter, WebhookReceiver
 
 console = Console()
 
+# Seconds bulk-sync waits for a completion webhook before polling, when
+# receiving webhooks and no --webhook-timeout is given
+DEFAULT_WEBHOOK_TIMEOUT = 600.0
+
+
+class ThroughputColumn(ProgressColumn):
+    """Renders completed syncs per minute."""
+
+    def render(self, task) -> Text:
+        if not task.speed:
+            return Text("-- syncs/min", style="progress.data.speed")
+        return Text(f"{task.speed * 60:.1f} syncs/min", style="progress.data.speed")
+
+
 @click.group()
 def cli():
     """Airbyte API CLI tool"""
     pass
 
+
+def _progress() -> Progress:
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        ThroughputColumn(),
+        TimeElapsedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+        # Syncs take minutes, so average throughput over a wide window
+        speed_estimate_period=600,
+    )
+
+
+class _BulkSyncReporter:
+    """Fans each finished job out to the progress bar, sink and checkpoint."""
+
+    def __init__(self, progress: Progress, total: Optional[int],
+                 sink: Optional[JsonlSink], checkpoint: Optional[SyncCheckpoint]):
+        self.progress = progress
+        self.task = progress.add_task("Syncing", total=total)
+        self.sink = sink
+        self.checkpoint = checkpoint
+        self.statuses = Counter()
+
+    def record(self, job) -> None:
+        self.statuses[job.status] += 1
+        if self.sink:
+            self.sink.write(job)
+        if self.checkpoint:
+            self.checkpoint.mark(job)
+        self.progress.update(self.task, advance=1)
+
+
+async def _run_bulk_sync(
+    connection_ids,
+    max_concurrent: int,
+    rate_limit: float,
+    reporter: _BulkSyncReporter,
+    webhook_timeout: Optional[float] = None,
+    receiver: Optional[Dict[str, Any]] = None
+) -> None:
+    async with AsyncExitStack() as stack:
+        client = await stack.enter_async_context(AirbyteApiClient(
+            rate_limiter=SharedRateBudget(rate_limit), webhook_timeout=webhook_timeout
+        ))
+        if receiver:
+            await stack.enter_async_context(
+                WebhookReceiver(client.sync_notifications.publish, **receiver)
+            )
+        async for job in client.iter_bulk_sync(connection_ids, max_concurrent):
+            reporter.record(job)
+
+
+def _run_sharded_bulk_sync(
+    connection_ids,
+    processes: int,
+    max_concurrent: int,
+    rate_limit: float,
+    reporter: _BulkSyncReporter,
+    webhook_timeout: Optional[float] = None,
+    receiver: Optional[Dict[str, Any]] = None
+) -> None:
+    with ExitStack() as stack:
+        router = None
+        if receiver:
+            # Received here, then routed to the worker syncing the connection
+            router = NotificationRouter()
+            stack.enter_context(WebhookReceiver(router.publish, **receiver).in_thread())
+        # Sharding needs the full id list up front to partition it
+        for job in iter_sharded_bulk_sync(
+            list(connection_ids),
+            processes=processes or None,
+            max_concurrent=max_concurrent,
+            rate_limit_per_second=rate_limit,
+            client_kwargs={"webhook_timeout": webhook_timeout},
+            router=router
+        ):
+            reporter.record(job)
+
+
 @cli.command()
-@click.argument('connections_file')
+@click.argument('connections_file', default='-')
 @click.option('--max-concurrent', default=5, help='Maximum concurrent syncs')
-def bulk_sync(connections_file: str, max_concurrent: int):
-    """Execute bulk sync from a YAML configuration file."""
-    with open(connections_file) as f:
-        config = yaml.safe_load(f)
+@click.option('--format', 'input_format', type=click.Choice(['yaml', 'json', 'jsonl']),
+              default=None, help='Input format (defaults to the file extension, YAML for stdin)')
+@click.option('--output', '-o', default=None, help='JSONL file results are appended to as jobs finish')
+@click.option('--checkpoint', default=None, help='Checkpoint file used to skip finished connections on resume')
+@click.option('--processes', default=1, help='Shard syncs across this many worker processes (0 = one per CPU)')
+@click.option('--rate-limit', default=10.0, help='Global API requests per second shared by all workers')
+@click.option('--webhook-port', type=int, envvar='AIRBYTE_WEBHOOK_PORT', default=None,
+              help='Receive completion webhooks on this port, polling only as a fallback')
+@click.option('--webhook-host', default='0.0.0.0', help='Interface the webhook receiver listens on')
+@click.option('--webhook-secret', envvar='AIRBYTE_WEBHOOK_SECRET', default=None,
+              help='Shared webhook secret (required with --webhook-port)')
+@click.option('--webhook-timeout', type=float, envvar='AIRBYTE_WEBHOOK_TIMEOUT', default=None,
+              help=f'Seconds to wait for a completion webhook before polling '
+                   f'(default {DEFAULT_WEBHOOK_TIMEOUT:.0f} with --webhook-port)')
+def bulk_sync(
+    connections_file: str,
+    max_concurrent: int,
+    input_format: Optional[str],
+    output: Optional[str],
+    checkpoint: Optional[str],
+    processes: int,
+    rate_limit: float,
+    webhook_port: Optional[int],
+    webhook_host: str,
+    webhook_secret: Optional[str],
+    webhook_timeout: Optional[float]
+):
+    """Execute bulk sync from a YAML, JSON or JSONL file ('-' reads stdin).
 
-    client = AirbyteApiClient()
-    jobs = asyncio.run(client.bulk_sync(config['connections'], max_concurrent))
+    With --webhook-port, point Airbyte's sync webhook at
+    http://<this host>:<port>/webhooks/airbyte/sync?token=<secret>.
+    """
+    receiver = None
+    if webhook_port is not None:
+        if not webhook_secret:
+            raise click.UsageError("--webhook-port needs --webhook-secret or AIRBYTE_WEBHOOK_SECRET")
+        receiver = {"secret": webhook_secret, "host": webhook_host, "port": webhook_port}
+        if webhook_timeout is None:
+            webhook_timeout = DEFAULT_WEBHOOK_TIMEOUT
+    connection_ids = read_connection_ids(connections_file, input_format)
+    total = count_entries(connections_file, input_format)
+
+    state = SyncCheckpoint(checkpoint) if checkpoint else None
+    sink = JsonlSink(output) if output else None
+    if state:
+        if state.completed:
+            console.print(f"Resuming: skipping {len(state.completed)} finished connections")
+            if total is not None:
+                total = max(total - len(state.completed), 0)
+        connection_ids = state.pending(connection_ids)
+
+    try:
+        with _progress() as progress:
+            reporter = _BulkSyncReporter(progress, total, sink, state)
+            if processes == 1:
+                asyncio.run(_run_bulk_sync(
+                    connection_ids, max_concurrent, rate_limit, reporter, webhook_timeout, receiver
+                ))
+            else:
+                _run_sharded_bulk_sync(
+                    connection_ids, processes, max_concurrent, rate_limit, reporter,
+                    webhook_timeout, receiver
+                )
+    finally:
+        if sink:
+            sink.close()
+        if state:
+            state.close()
 
     table = Table(title="Sync Results")
-    table.add_column("Connection ID")
     table.add_column("Status")
-    table.add_column("Duration (s)")
-    table.add_column("Records Synced")
+    table.add_column("Jobs")
+    for status, count in reporter.statuses.most_common():
+        table.add_row(status, str(count))
+    console.print(table)
 
-    for job in jobs:
-        table.add_row(
-            job.connection_id,
-            job.status,
-            str((job.end_time - job.start_time).total_seconds()),
-            str(job.records_synced)
+
+async def _find_connections(workspace_id: str, snapshot: Optional[str], refresh: bool, filters: dict):
+    async with AirbyteApiClient() as client:
+        # --refresh lists the workspace instead of loading the snapshot
+        catalog = await client.get_catalog(
+            workspace_id, snapshot_path=None if refresh else snapshot, refresh_interval=None
         )
+        if refresh and snapshot:
+            await catalog.write_snapshot(snapshot)
+        return catalog, catalog.find_connections(**filters)
+
+
+@cli.command()
+@click.option('--workspace-id', envvar='AIRBYTE_WORKSPACE_ID', required=True, help='Workspace to look in')
+@click.option('--source', 'source_id', default=None, help='Only connections reading from this source id')
+@click.option('--destination', 'destination_id', default=None, help='Only connections writing to this destination id')
+@click.option('--definition', default=None, help='Only connections whose source or destination uses this definition id')
+@click.option('--name', default=None, help='Only connections with this exact name')
+@click.option('--snapshot', default=None, help='Catalog snapshot file, loaded instead of listing the workspace')
+@click.option('--refresh', is_flag=True, help='Re-list the workspace even when a snapshot exists')
+@click.option('--ids', is_flag=True, help='Print matching ids as JSONL, e.g. to pipe into bulk-sync')
+def find_connections(
+    workspace_id: str,
+    source_id: Optional[str],
+    destination_id: Optional[str],
+    definition: Optional[str],
+    name: Optional[str],
+    snapshot: Optional[str],
+    refresh: bool,
+    ids: bool
+):
+    """Look up connections in the local workspace catalog."""
+    filters = {
+        key: value for key, value in (
+            ("source", source_id), ("destination", destination_id),
+            ("definition", definition), ("name", name)
+        ) if value is not None
+    }
+    catalog, found = asyncio.run(_find_connections(workspace_id, snapshot, refresh, filters))
 
+    if ids:
+        for connection in found:
+            click.echo(json.dumps({"connection_id": connection["connectionId"]}))
+        return
+
+    table = Table(title=f"Connections ({len(found)})")
+    for column in ("Connection", "Name", "Source", "Destination", "Status"):
+        table.add_column(column)
+    for connection in found:
+        source = catalog.source(connection.get("sourceId")) or {}
+        destination = catalog.destination(connection.get("destinationId")) or {}
+        table.add_row(
+            connection["connectionId"],
+            connection.get("name", ""),
+            source.get("name", connection.get("sourceId", "")),
+            destination.get("name", connection.get("destinationId", "")),
+            connection.get("status", "")
+        )
     console.print(table)
 
+
+@cli.command()
+@click.argument('connection_id')
+@click.option('--url', default='http://localhost:8000/api/api/v1/webhooks/airbyte/sync',
+              help='Webhook receiver URL')
+@click.option('--secret', envvar='AIRBYTE_WEBHOOK_SECRET', required=True, help='Shared webhook secret')
+@click.option('--status', type=click.Choice(['SUCCEEDED', 'FAILED']), default='SUCCEEDED')
+@click.option('--job-id', default=None, help='Airbyte job id the notification is for')
+@click.option('--records', default=0, help='Records synced')
+def emit_webhook(connection_id: str, url: str, secret: str, status: str, job_id: Optional[str], records: int):
+    """Send a signed sync-completion webhook, standing in for Airbyte."""
+    emitter = WebhookEmitter(url, secret)
+    result = asyncio.run(emitter.emit(connection_id, status, job_id, records))
+    console.print(result)
+
+
 if __name__ == '__main__':
     cli()
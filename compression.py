@@ -0,0 +1,96 @@
+"""
+Compressed transport helpers. Negotiates gzip/brotli responses, decodes
+them incrementally as chunks arrive, optionally gzips large request
+bodies, and counts wire versus decoded bytes so savings are measurable.
+"""
+
+import gzip
+import zlib
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import Counter
+
+try:
+    import brotli  # optional; enables "br" negotiation
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+WIRE_BYTES = Counter(
+    'airbyte_transfer_wire_bytes_total',
+    'Bytes sent to or received from the Airbyte API on the wire',
+    ['direction']
+)
+BYTES_SAVED = Counter(
+    'airbyte_transfer_bytes_saved_total',
+    'Bytes saved by compression on Airbyte API traffic',
+    ['direction']
+)
+
+
+def accept_encoding() -> str:
+    """Accept-Encoding value for the codecs available here."""
+    return "br, gzip, deflate" if brotli is not None else "gzip, deflate"
+
+
+class StreamingDecoder:
+    """Incrementally decodes a Content-Encoding as body chunks arrive."""
+
+    def __init__(self, encoding: Optional[str]):
+        encoding = (encoding or "identity").strip().lower()
+        if encoding == "gzip":
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._decoder = zlib.decompressobj(zlib.MAX_WBITS)
+        elif encoding == "br" and brotli is not None:
+            self._decoder = brotli.Decompressor()
+        elif encoding == "identity":
+            self._decoder = None
+        else:
+            raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+        self.encoding = encoding
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+
+    def feed(self, chunk: bytes) -> bytes:
+        self.wire_bytes += len(chunk)
+        if self._decoder is None:
+            data = chunk
+        elif self.encoding == "br":
+            data = self._decoder.process(chunk)
+        else:
+            data = self._decoder.decompress(chunk)
+        self.decoded_bytes += len(data)
+        return data
+
+    def flush(self) -> bytes:
+        data = b""
+        if self._decoder is not None and self.encoding != "br":
+            data = self._decoder.flush()
+        self.decoded_bytes += len(data)
+        return data
+
+    def record(self) -> None:
+        """Publish this response's byte counts to the transfer metrics."""
+        record_transfer("response", self.wire_bytes, self.decoded_bytes)
+
+
+def record_transfer(direction: str, wire_bytes: int, raw_bytes: int) -> None:
+    WIRE_BYTES.labels(direction=direction).inc(wire_bytes)
+    if raw_bytes > wire_bytes:
+        BYTES_SAVED.labels(direction=direction).inc(raw_bytes - wire_bytes)
+
+
+def compress_body(body: bytes, threshold: Optional[int]) -> Tuple[bytes, Dict[str, str]]:
+    """Gzip a request body above ``threshold`` bytes when it actually shrinks."""
+    if threshold is None or len(body) <= threshold:
+        record_transfer("request", len(body), len(body))
+        return body, {}
+    compressed = gzip.compress(body, compresslevel=6)
+    if len(compressed) >= len(body):
+        record_transfer("request", len(body), len(body))
+        return body, {}
+    record_transfer("request", len(compressed), len(body))
+    return compressed, {"Content-Encoding": "gzip"}
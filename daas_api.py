@@ -1,25 +1,144 @@
-from fastapi import FastAPI, Depends
+import asyncio
+import os
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.security import APIKeyHeader
-from typing import List
-from daas_service import DataService, DataServiceConfig
+from typing import List, Optional
+from airbyte_manage import AirbyteApiClient
+from daas_service import DataService, DataServiceConfig, PipelineMetricsBatchRequest, PipelineNotFound
+from fair_queue import current_tenant, tenant_id
+from sync_notifications import (
+    DELIVERY_HEADER, SIGNATURE_HEADER, WebhookRejected, read_webhook, webhook_receipt,
+)
 
 app = FastAPI(title="Data as a Service API")
 api_key_header = APIKeyHeader(name="X-API-Key")
 
+MAX_METRICS_BATCH = 500
+CATALOG_RETRY_INTERVAL = 60.0
+
+_client: Optional[AirbyteApiClient] = None
+_service: Optional[DataService] = None
+_service_lock = asyncio.Lock()
+
+
+async def get_client() -> AirbyteApiClient:
+    """Process-wide client, so webhooks resolve the waiters of its syncs."""
+    global _client
+    if _client is None:
+        _client = AirbyteApiClient(
+            webhook_timeout=float(os.getenv("AIRBYTE_WEBHOOK_TIMEOUT", "0")) or None
+        )
+    return _client
+
+
+async def get_service(client: AirbyteApiClient = Depends(get_client)) -> DataService:
+    """Process-wide service, so pipeline metric rollups are shared."""
+    global _service
+    if _service is None:
+        async with _service_lock:
+            if _service is None:
+                service = DataService(
+                    client,
+                    tenant_tiers_path=os.getenv("DAAS_TENANT_TIERS_FILE")
+                )
+                service.start_metrics_refresh()
+                workspace_id = os.getenv("AIRBYTE_WORKSPACE_ID")
+                if workspace_id:
+                    # Loads in the background; catalog-backed routes 503 until then
+                    service.start_catalog_load(workspace_id, CATALOG_RETRY_INTERVAL)
+                _service = service
+    return _service
+
+
+async def get_tenant(api_key: str = Depends(api_key_header)) -> str:
+    """Attribute this request's outbound Airbyte calls to the caller."""
+    tenant = tenant_id(api_key)
+    current_tenant.set(tenant)
+    return tenant
+
+
 @app.post("/api/v1/pipelines")
 async def create_pipeline(
     config: DataServiceConfig,
-    api_key: str = Depends(api_key_header)
+    tenant: str = Depends(get_tenant),
+    service: DataService = Depends(get_service)
 ):
     """Create a new data pipeline"""
-    service = DataService()
     return await service.create_data_pipeline(config)
 
+@app.get("/api/v1/pipelines/{pipeline_id}")
+async def get_pipeline(
+    pipeline_id: str,
+    tenant: str = Depends(get_tenant),
+    service: DataService = Depends(get_service)
+):
+    """Get a pipeline's definition from the local workspace catalog"""
+    if service.catalog is None:
+        raise HTTPException(status_code=503, detail="Workspace catalog is not available")
+    pipeline = service.get_pipeline(pipeline_id)
+    if pipeline is None:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    return pipeline
+
 @app.get("/api/v1/pipelines/{pipeline_id}/metrics")
 async def get_pipeline_metrics(
     pipeline_id: str,
-    api_key: str = Depends(api_key_header)
+    tenant: str = Depends(get_tenant),
+    service: DataService = Depends(get_service)
 ):
     """Get pipeline metrics"""
-    service = DataService()
-    return await service.get_pipeline_metrics(pipeline_id)
+    try:
+        return await service.get_pipeline_metrics(pipeline_id)
+    except PipelineNotFound:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+
+@app.post("/api/v1/pipelines/metrics/batch")
+async def get_pipeline_metrics_batch(
+    batch: PipelineMetricsBatchRequest,
+    tenant: str = Depends(get_tenant),
+    service: DataService = Depends(get_service)
+):
+    """Get metrics for many pipelines in one call"""
+    if len(batch.pipeline_ids) > MAX_METRICS_BATCH:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_METRICS_BATCH} pipelines per batch"
+        )
+    return await service.get_pipeline_metrics_batch(batch.pipeline_ids)
+
+@app.post("/api/v1/webhooks/airbyte/sync")
+async def airbyte_sync_webhook(
+    request: Request,
+    token: Optional[str] = None,
+    client: AirbyteApiClient = Depends(get_client)
+):
+    """Receive Airbyte sync-completion notifications"""
+    secret = os.getenv("AIRBYTE_WEBHOOK_SECRET")
+    if not secret:
+        raise HTTPException(status_code=503, detail="Webhook receiver is not configured")
+
+    try:
+        notification = read_webhook(
+            await request.body(),
+            secret,
+            request.headers.get(SIGNATURE_HEADER),
+            token,
+            request.headers.get(DELIVERY_HEADER)
+        )
+    except WebhookRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    return webhook_receipt(notification, client.sync_notifications.publish(notification))
+
+@app.get("/api/v1/queue/stats")
+async def get_queue_stats(
+    tenant: str = Depends(get_tenant),
+    service: DataService = Depends(get_service)
+):
+    """Outbound request queue depth and wait times for the caller"""
+    stats = service.request_queue.stats()
+    return {
+        "in_flight": stats["in_flight"],
+        "max_in_flight": stats["max_in_flight"],
+        "tenant": stats["tenants"].get(tenant)
+    }
@@ -1,6 +1,15 @@
-from typing import Dict, Any
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional
 from pydantic import BaseModel
-from airbyte_manage import AirbyteApiClient
+from airbyte_manage import AirbyteApiClient, ApiRequestError, PremiumFeatureException
+from catalog import WorkspaceCatalog
+from fair_queue import DEFAULT_TENANT, TenantPolicy, WeightedFairQueue, current_tenant
 
 
 class DataServiceConfig(BaseModel):
@@ -12,26 +21,115 @@ class DataServiceConfig(BaseModel):
     pricing_tier: str = "basic"
 
 
+class PipelineMetricsBatchRequest(BaseModel):
+    pipeline_ids: List[str]
+
+
+class PipelineNotFound(LookupError):
+    """Exception for pipelines Airbyte does not know"""
+
+
 class DataService:
-    def __init__(self, client: AirbyteApiClient):
+    def __init__(
+        self,
+        client: AirbyteApiClient,
+        refresh_interval: float = 60.0,
+        max_concurrent_fetches: int = 20,
+        max_refresh_failures: int = 3,
+        rollup_ttl: float = 3600.0,
+        max_upstream_in_flight: int = 20,
+        tenant_tiers: Optional[Dict[str, str]] = None,
+        tenant_tiers_path: Optional[str] = None,
+        internal_tier: str = "professional",
+        catalog: Optional[WorkspaceCatalog] = None
+    ):
         self.client = client
+        # Local workspace view for pipeline lookups without upstream calls
+        self.catalog = catalog
+        self.logger = logging.getLogger(__name__)
+        # Per-pipeline metric rollups, refreshed in the background
+        self.refresh_interval = refresh_interval
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._tracked: set = set()
+        # Consecutive failed refreshes per tracked pipeline; dropped at the max
+        self._failures: Dict[str, int] = {}
+        self.max_refresh_failures = max_refresh_failures
+        # Last read per tracked pipeline; unread for rollup_ttl and it is dropped
+        self._last_read: Dict[str, float] = {}
+        self.rollup_ttl = rollup_ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._fetch_slots = asyncio.Semaphore(max_concurrent_fetches)
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._catalog_task: Optional[asyncio.Task] = None
         self.pricing = {
             "basic": {
                 "price": 99,
                 "sync_frequency": "daily",
-                "support": "email"
+                "support": "email",
+                "queue_weight": 1,
+                "max_in_flight": 2
             },
             "professional": {
                 "price": 299,
                 "sync_frequency": "hourly",
-                "support": "priority"
+                "support": "priority",
+                "queue_weight": 3,
+                "max_in_flight": 5
             },
             "enterprise": {
                 "price": 999,
                 "sync_frequency": "real-time",
-                "support": "dedicated"
+                "support": "dedicated",
+                "queue_weight": 10,
+                "max_in_flight": 10
             }
         }
+        # Outbound Airbyte calls are fair-queued per tenant by pricing tier
+        # Tiers come from server-side config (a JSON file of tenant id -> tier,
+        # kept up to date by register_tenant), never from request input
+        self.tenant_tiers_path = tenant_tiers_path
+        self.tenant_tiers: Dict[str, str] = {**self._load_tenant_tiers(), **(tenant_tiers or {})}
+        self.internal_tier = internal_tier
+        self.request_queue = WeightedFairQueue(self.tenant_policy, max_upstream_in_flight)
+        self.client.request_queue = self.request_queue
+
+    def tenant_policy(self, tenant: str) -> TenantPolicy:
+        """Queue weight and in-flight cap for a tenant's pricing tier"""
+        if tenant == DEFAULT_TENANT:
+            tier = self.internal_tier  # background refreshes and internal calls
+        else:
+            tier = self.tenant_tiers.get(tenant, "basic")
+        plan = self.pricing[tier]
+        return TenantPolicy(tier, plan["queue_weight"], plan["max_in_flight"])
+
+    def _load_tenant_tiers(self) -> Dict[str, str]:
+        if not self.tenant_tiers_path or not os.path.exists(self.tenant_tiers_path):
+            return {}
+        with open(self.tenant_tiers_path) as f:
+            tiers = json.load(f)
+        unknown = {t for t, tier in tiers.items() if tier not in self.pricing}
+        if unknown:
+            self.logger.warning(f"Ignoring {len(unknown)} tenants with unknown tiers in {self.tenant_tiers_path}")
+        return {t: tier for t, tier in tiers.items() if t not in unknown}
+
+    def _save_tenant_tiers(self) -> None:
+        tmp_path = f"{self.tenant_tiers_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.tenant_tiers, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.tenant_tiers_path)
+
+    def register_tenant(self, tenant: str, pricing_tier: str) -> None:
+        """Record a tenant's billed tier, e.g. on a subscription change.
+
+        Applies to its queue from the next call and is persisted to
+        tenant_tiers_path when one is configured.
+        """
+        if pricing_tier not in self.pricing:
+            raise ValueError(f"Unknown pricing tier: {pricing_tier}")
+        self.tenant_tiers[tenant] = pricing_tier
+        self.request_queue.refresh_policy(tenant)
+        if self.tenant_tiers_path:
+            self._save_tenant_tiers()
 
     async def create_data_pipeline(self, config: DataServiceConfig) -> Dict[str, Any]:
         """Create a complete data pipeline for a customer"""
@@ -53,6 +151,12 @@ class DataService:
             sync_frequency=self.pricing[config.pricing_tier]["sync_frequency"]
         )
 
+        self._tracked.add(connection["connectionId"])
+        self._touch([connection["connectionId"]])
+        if self.catalog is not None:
+            self.catalog.upsert("sources", source)
+            self.catalog.upsert("destinations", destination)
+            self.catalog.upsert("connections", connection)
         return {
             "pipeline_id": connection["connectionId"],
             "status": "active",
@@ -60,14 +164,175 @@ class DataService:
             "monthly_cost": self.pricing[config.pricing_tier]["price"]
         }
 
+    def get_pipeline(self, pipeline_id: str) -> Optional[Dict[str, Any]]:
+        """Pipeline definition from the workspace catalog"""
+        connection = self.catalog.connection(pipeline_id)
+        if connection is None:
+            return None
+        source = self.catalog.source(connection.get("sourceId")) or {}
+        destination = self.catalog.destination(connection.get("destinationId")) or {}
+        return {
+            "pipeline_id": pipeline_id,
+            "name": connection.get("name"),
+            "status": connection.get("status"),
+            "source": {"id": connection.get("sourceId"), "name": source.get("name")},
+            "destination": {"id": connection.get("destinationId"), "name": destination.get("name")}
+        }
+
+    def _touch(self, pipeline_ids: Iterable[str]) -> None:
+        now = time.monotonic()
+        for pipeline_id in pipeline_ids:
+            self._last_read[pipeline_id] = now
+
     async def get_pipeline_metrics(self, pipeline_id: str) -> Dict[str, Any]:
         """Get analytics for a data pipeline"""
-        status = await self.client.check_connection_status(pipeline_id)
-        metrics = await self.client.advanced_monitoring()
+        self._touch([pipeline_id])
+        metrics = self._metrics.get(pipeline_id)
+        if metrics is None:
+            errors = await self.refresh_pipeline_metrics([pipeline_id])
+            if pipeline_id in errors:
+                error = errors[pipeline_id]
+                if isinstance(error, ApiRequestError) and error.status == 404:
+                    raise PipelineNotFound(pipeline_id) from error
+                raise error
+            metrics = self._metrics[pipeline_id]
+        return metrics
 
+    async def get_pipeline_metrics_batch(self, pipeline_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get analytics for many pipelines, fetching only uncached ones"""
+        pipeline_ids = list(dict.fromkeys(pipeline_ids))
+        self._touch(pipeline_ids)
+        missing = [p for p in pipeline_ids if p not in self._metrics]
+        errors = await self.refresh_pipeline_metrics(missing) if missing else {}
         return {
-            "status": status.status,
-            "records_synced": metrics.get("records_synced", 0),
-            "last_sync": status.last_sync,
-            "performance_metrics": metrics
+            p: self._metrics[p] if p in self._metrics else {"error": str(errors.get(p))}
+            for p in pipeline_ids
         }
+
+    async def _fetch_status(self, pipeline_id: str):
+        """Fetch a pipeline's status, sharing one upstream call between
+        concurrent callers asking for the same pipeline."""
+        future = self._inflight.get(pipeline_id)
+        if future is None:
+            async def fetch():
+                async with self._fetch_slots:
+                    return await self.client.check_connection_status(
+                        pipeline_id, fields=("status", "last_sync")
+                    )
+            future = asyncio.ensure_future(fetch())
+            self._inflight[pipeline_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(pipeline_id, None))
+        return await asyncio.shield(future)
+
+    async def refresh_pipeline_metrics(self, pipeline_ids: Optional[Iterable[str]] = None) -> Dict[str, Exception]:
+        """Recompute rollups (all tracked pipelines by default).
+
+        Only pipelines whose status fetch succeeds are tracked. Returns the
+        pipelines whose fetch failed; a tracked pipeline keeps its previous
+        rollup until max_refresh_failures consecutive failures drop it.
+        Tracked pipelines not read within rollup_ttl are dropped first.
+        """
+        if pipeline_ids is None:
+            self._drop_unread()
+            pipeline_ids = self._tracked
+        pipeline_ids = list(pipeline_ids)
+        if not pipeline_ids:
+            return {}
+        statuses = await asyncio.gather(
+            *(self._fetch_status(p) for p in pipeline_ids), return_exceptions=True
+        )
+        try:
+            monitoring = await self.client.advanced_monitoring(connection_ids=pipeline_ids)
+        except PremiumFeatureException:
+            monitoring = {}  # status-only rollups without premium monitoring
+        per_connection = monitoring.get("metrics", {}).get("per_connection", {})
+        anomalies = defaultdict(list)
+        for anomaly in monitoring.get("anomalies", []):
+            anomalies[anomaly["connection_id"]].append(anomaly)
+
+        errors = {}
+        updated_at = datetime.utcnow()
+        for pipeline_id, status in zip(pipeline_ids, statuses):
+            if isinstance(status, Exception):
+                errors[pipeline_id] = status
+                self._record_failure(pipeline_id)
+                continue
+            self._tracked.add(pipeline_id)
+            self._failures.pop(pipeline_id, None)
+            performance = per_connection.get(pipeline_id, {})
+            self._metrics[pipeline_id] = {
+                "status": status.status,
+                "records_synced": performance.get("records_synced", 0),
+                "last_sync": status.last_sync,
+                "performance_metrics": {
+                    "metrics": performance,
+                    "anomalies": anomalies.get(pipeline_id, [])
+                },
+                "updated_at": updated_at
+            }
+        return errors
+
+    def _record_failure(self, pipeline_id: str) -> None:
+        if pipeline_id not in self._tracked:
+            return
+        failures = self._failures.get(pipeline_id, 0) + 1
+        if failures < self.max_refresh_failures:
+            self._failures[pipeline_id] = failures
+            return
+        self.logger.warning(f"Untracking pipeline {pipeline_id} after {failures} failed refreshes")
+        self._untrack(pipeline_id)
+
+    def _drop_unread(self) -> None:
+        cutoff = time.monotonic() - self.rollup_ttl
+        unread = [p for p in self._tracked if self._last_read.get(p, cutoff) <= cutoff]
+        for pipeline_id in unread:
+            self._untrack(pipeline_id)
+        if unread:
+            self.logger.info(f"Untracked {len(unread)} pipelines not read in {self.rollup_ttl}s")
+
+    def _untrack(self, pipeline_id: str) -> None:
+        self._tracked.discard(pipeline_id)
+        self._metrics.pop(pipeline_id, None)
+        self._failures.pop(pipeline_id, None)
+        self._last_read.pop(pipeline_id, None)
+
+    async def _refresh_loop(self) -> None:
+        # The task copied its creator's context; refreshes are internal calls
+        current_tenant.set(None)
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                errors = await self.refresh_pipeline_metrics()
+                if errors:
+                    self.logger.warning(f"Metrics refresh failed for {len(errors)} pipelines")
+            except Exception as e:
+                self.logger.error(f"Metrics refresh failed: {str(e)}")
+
+    def start_metrics_refresh(self) -> None:
+        """Keep tracked pipeline rollups up to date in the background"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def _load_catalog(self, workspace_id: str, retry_interval: float) -> None:
+        current_tenant.set(None)
+        while self.catalog is None:
+            try:
+                self.catalog = await self.client.get_catalog(workspace_id)
+            except Exception as e:
+                self.logger.error(f"Catalog load failed, retrying in {retry_interval}s: {str(e)}")
+                await asyncio.sleep(retry_interval)
+
+    def start_catalog_load(self, workspace_id: str, retry_interval: float = 60.0) -> None:
+        """Attach the workspace catalog once it loads, retrying on failure"""
+        if self.catalog is None and (self._catalog_task is None or self._catalog_task.done()):
+            self._catalog_task = asyncio.get_running_loop().create_task(
+                self._load_catalog(workspace_id, retry_interval)
+            )
+
+    def stop_metrics_refresh(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self._catalog_task is not None:
+            self._catalog_task.cancel()
+            self._catalog_task = None
@@ -20,7 +20,7 @@ class Dashboard:
 
         @app.get("/api/sync-status")
         async def get_sync_status(api_key: str = Depends(api_key_header)):
-            jobs = await self.client.bulk_sync(self.client.get_all_connections())
+            jobs = await self.client.bulk_sync(await self.client.get_all_connections())
             return self.client.generate_sync_report(jobs).to_dict()
 
     def start(self, port: int = 8000):
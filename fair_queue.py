@@ -0,0 +1,210 @@
+"""
+Weighted fair queuing of outbound Airbyte calls across DaaS tenants.
+Requests wait for one of a fixed number of upstream slots; when slots are
+contended they are granted in start-time fair queuing order, so each
+tenant's share tracks its pricing-tier weight and no tenant exceeds its
+own in-flight cap.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from prometheus_client import Gauge, Histogram
+
+# Tenant on whose behalf the current task calls Airbyte
+current_tenant: ContextVar[Optional[str]] = ContextVar("airbyte_tenant", default=None)
+
+DEFAULT_TENANT = "default"
+
+QUEUE_DEPTH = Gauge(
+    'airbyte_tenant_queue_depth',
+    'Outbound requests waiting for an upstream slot',
+    ['tier']
+)
+QUEUE_WAIT = Histogram(
+    'airbyte_tenant_queue_wait_seconds',
+    'Time outbound requests waited for an upstream slot',
+    ['tier']
+)
+
+
+def tenant_id(api_key: str) -> str:
+    """Stable, non-reversible tenant id for an API key."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+@dataclass
+class TenantPolicy:
+    tier: str
+    weight: float
+    max_in_flight: int
+
+
+class _TenantState:
+    __slots__ = ("policy", "waiters", "in_flight", "vtime", "served", "wait_total", "queued")
+
+    def __init__(self, policy: TenantPolicy):
+        self.policy = policy
+        self.waiters: Deque[Tuple[asyncio.Future, float]] = deque()
+        self.in_flight = 0
+        self.vtime = 0.0
+        self.served = 0
+        self.wait_total = 0.0
+        # Has an entry in the backlog heap
+        self.queued = False
+
+
+class WeightedFairQueue:
+    """Start-time fair queuing of upstream request slots by tenant.
+
+    Backlogged tenants are kept in a heap by virtual time, so granting a
+    slot does not scan every tenant. Idle tenants (nothing queued or in
+    flight) keep their stats until more than ``max_idle_tenants`` are idle,
+    then the least recently active are forgotten.
+    """
+
+    def __init__(
+        self,
+        policy_for: Callable[[str], TenantPolicy],
+        max_in_flight: int = 20,
+        max_idle_tenants: int = 1024
+    ):
+        self.policy_for = policy_for
+        self.max_in_flight = max_in_flight
+        self.max_idle_tenants = max_idle_tenants
+        self.in_flight = 0
+        self.waiting = 0
+        self._vtime = 0.0
+        self._tenants: Dict[str, _TenantState] = {}
+        self._idle: "OrderedDict[str, None]" = OrderedDict()
+        # (vtime, sequence, tenant, state) of tenants with eligible waiters
+        self._backlog: list = []
+        self._sequence = itertools.count()
+
+    def _state(self, tenant: str) -> _TenantState:
+        state = self._tenants.get(tenant)
+        if state is None:
+            state = self._tenants[tenant] = _TenantState(self.policy_for(tenant))
+        self._idle.pop(tenant, None)
+        return state
+
+    def _settle(self, tenant: str, state: _TenantState) -> None:
+        """Note a tenant that may have gone idle, evicting the oldest idle ones."""
+        if state.waiters or state.in_flight or self._tenants.get(tenant) is not state:
+            return
+        self._idle[tenant] = None
+        self._idle.move_to_end(tenant)
+        while len(self._idle) > self.max_idle_tenants:
+            evicted, _ = self._idle.popitem(last=False)
+            del self._tenants[evicted]
+
+    def _enqueue(self, tenant: str, state: _TenantState) -> None:
+        if state.waiters and not state.queued and self._eligible(state):
+            state.queued = True
+            heapq.heappush(self._backlog, (state.vtime, next(self._sequence), tenant, state))
+
+    def _grant(self, state: _TenantState, waited: float) -> None:
+        self._vtime = state.vtime
+        state.vtime += 1.0 / state.policy.weight
+        state.in_flight += 1
+        state.served += 1
+        state.wait_total += waited
+        self.in_flight += 1
+        QUEUE_WAIT.labels(tier=state.policy.tier).observe(waited)
+
+    def _eligible(self, state: _TenantState) -> bool:
+        return state.in_flight < state.policy.max_in_flight
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.max_in_flight and self._backlog:
+            vtime, _, tenant, state = heapq.heappop(self._backlog)
+            state.queued = False
+            if vtime != state.vtime:
+                self._enqueue(tenant, state)  # stale entry; re-key it
+                continue
+            if not state.waiters or not self._eligible(state):
+                continue  # drained by cancellation, or re-queued on release
+            future, enqueued = state.waiters.popleft()
+            self.waiting -= 1
+            QUEUE_DEPTH.labels(tier=state.policy.tier).dec()
+            self._grant(state, time.monotonic() - enqueued)
+            future.set_result(None)
+            self._enqueue(tenant, state)
+
+    async def acquire(self, tenant: str) -> None:
+        state = self._state(tenant)
+        if not state.waiters:
+            # A tenant going from idle to backlogged may not bank credit
+            state.vtime = max(state.vtime, self._vtime)
+        if self.in_flight < self.max_in_flight and self._eligible(state) and not self.waiting:
+            self._grant(state, 0.0)
+            return
+
+        entry = (asyncio.get_running_loop().create_future(), time.monotonic())
+        state.waiters.append(entry)
+        self.waiting += 1
+        QUEUE_DEPTH.labels(tier=state.policy.tier).inc()
+        self._enqueue(tenant, state)
+        self._dispatch()
+        try:
+            await entry[0]
+        except asyncio.CancelledError:
+            if entry in state.waiters:
+                state.waiters.remove(entry)
+                self.waiting -= 1
+                QUEUE_DEPTH.labels(tier=state.policy.tier).dec()
+                self._settle(tenant, state)
+            elif not entry[0].cancelled():
+                self.release(tenant)  # granted just as we were cancelled
+            raise
+
+    def release(self, tenant: str) -> None:
+        state = self._tenants[tenant]
+        state.in_flight -= 1
+        self.in_flight -= 1
+        self._enqueue(tenant, state)
+        self._dispatch()
+        self._settle(tenant, state)
+
+    def refresh_policy(self, tenant: str) -> None:
+        """Re-read a tenant's policy, e.g. after a tier change."""
+        state = self._tenants.get(tenant)
+        if state is not None:
+            state.policy = self.policy_for(tenant)
+            self._enqueue(tenant, state)  # a raised cap may unblock waiters
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tenant: Optional[str] = None):
+        """Hold an upstream slot for the current (or given) tenant."""
+        tenant = tenant or current_tenant.get() or DEFAULT_TENANT
+        await self.acquire(tenant)
+        try:
+            yield
+        finally:
+            self.release(tenant)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tenant queue depth, in-flight count and mean wait."""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "tenants": {
+                tenant: {
+                    "tier": s.policy.tier,
+                    "queue_depth": len(s.waiters),
+                    "in_flight": s.in_flight,
+                    "served": s.served,
+                    "mean_wait_seconds": s.wait_total / s.served if s.served else 0.0,
+                }
+                for tenant, s in self._tenants.items()
+            },
+        }
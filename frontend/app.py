@@ -1,20 +1,27 @@
+from pathlib import Path
+
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from stripe import checkout
+from frontend.assets import STATIC_DIR, AssetManifest, PrecompressedStaticFiles
+
+BASE_DIR = Path(__file__).parent
 
 app = FastAPI()
-templates = Jinja2Templates(directory="templates")
-app.mount("/static", StaticFiles(directory="static"), name="static")
+templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+assets = AssetManifest(STATIC_DIR / "dist")
+templates.env.globals["asset_url"] = assets.url
+app.mount("/static", PrecompressedStaticFiles(directory=str(STATIC_DIR)), name="static")
 
 @app.get("/", response_class=HTMLResponse)
 async def homepage(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
 
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(request: Request):
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    return templates.TemplateResponse(request, "dashboard.html")
 
 @app.post("/create-checkout-session/{tier}")
 async def create_checkout(tier: str):
@@ -0,0 +1,190 @@
+"""
+Production static assets. Copies each file under ``static/`` to a
+content-hashed name in ``static/dist/`` with gzip (and brotli, when
+available) siblings, and serves them with immutable caching so browsers
+only re-download an asset when its content changes.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import shutil
+import stat
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli  # optional; adds .br variants
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).parent / "static"
+DIST_DIRNAME = "dist"
+MANIFEST_NAME = "manifest.json"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Already-compressed formats gain nothing from another pass
+_INCOMPRESSIBLE = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".woff", ".woff2", ".gz", ".br", ".zip"}
+
+# Preference order when the client accepts several
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def is_production() -> bool:
+    return os.getenv("APP_ENV", "development") == "production"
+
+
+def _hashed_name(path: Path, digest: str) -> str:
+    return f"{path.stem}.{digest}{path.suffix}"
+
+
+def _write_variants(target: Path, data: bytes) -> None:
+    target.write_bytes(data)
+    if target.suffix.lower() in _INCOMPRESSIBLE:
+        return
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < len(data):
+        target.with_name(target.name + ".gz").write_bytes(compressed)
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data):
+            target.with_name(target.name + ".br").write_bytes(compressed)
+
+
+def build_assets(
+    static_dir: Union[str, Path] = STATIC_DIR,
+    dist_dir: Optional[Union[str, Path]] = None
+) -> Dict[str, str]:
+    """Build hashed, precompressed copies of the static files.
+
+    Returns the manifest mapping each source path (relative to
+    ``static_dir``) to its hashed path, which is also written to
+    ``dist_dir/manifest.json``.
+    """
+    static_dir = Path(static_dir)
+    dist_dir = Path(dist_dir) if dist_dir is not None else static_dir / DIST_DIRNAME
+    if dist_dir.exists():
+        shutil.rmtree(dist_dir)
+    dist_dir.mkdir(parents=True)
+
+    manifest = {}
+    for source in sorted(static_dir.rglob("*")):
+        if not source.is_file() or dist_dir in source.parents:
+            continue
+        relative = source.relative_to(static_dir)
+        data = source.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        hashed = relative.with_name(_hashed_name(relative, digest))
+        target = dist_dir / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _write_variants(target, data)
+        manifest[relative.as_posix()] = hashed.as_posix()
+
+    (dist_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    logger.info("Built %d static assets into %s", len(manifest), dist_dir)
+    return manifest
+
+
+class AssetManifest:
+    """Resolves static paths to their hashed URLs for templates.
+
+    ``enabled=None`` follows the production profile, read on first use so
+    it may be selected after this module is imported (e.g. by run.py).
+    """
+
+    def __init__(self, dist_dir: Union[str, Path], url_prefix: str = "/static", enabled: Optional[bool] = None):
+        self.dist_dir = Path(dist_dir)
+        self.url_prefix = url_prefix.rstrip("/")
+        self._enabled = enabled
+        self._entries: Optional[Dict[str, str]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return is_production() if self._enabled is None else self._enabled
+
+    @property
+    def entries(self) -> Dict[str, str]:
+        if self._entries is None:
+            manifest_path = self.dist_dir / MANIFEST_NAME
+            enabled = self.enabled
+            if enabled and manifest_path.exists():
+                self._entries = json.loads(manifest_path.read_text())
+            else:
+                if enabled:
+                    logger.warning("No asset manifest at %s; serving unhashed assets", manifest_path)
+                self._entries = {}
+        return self._entries
+
+    def url(self, path: str) -> str:
+        path = path.lstrip("/")
+        hashed = self.entries.get(path)
+        if hashed is None:
+            return f"{self.url_prefix}/{path}"
+        return f"{self.url_prefix}/{self.dist_dir.name}/{hashed}"
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves .br/.gz siblings and caches hashed assets forever."""
+
+    def __init__(self, *args, immutable_prefix: str = DIST_DIRNAME + "/", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable_prefix = immutable_prefix
+
+    def _accepted(self, scope: Scope):
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        offered = {part.split(";")[0].strip().lower() for part in accept.split(",")}
+        return [(encoding, suffix) for encoding, suffix in _ENCODINGS if encoding in offered]
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        immutable = path.replace(os.sep, "/").startswith(self.immutable_prefix)
+        response = None
+        if scope["method"] in ("GET", "HEAD"):
+            response = await self._precompressed_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        if immutable and response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    async def _precompressed_response(self, path: str, scope: Scope) -> Optional[Response]:
+        for encoding, suffix in self._accepted(scope):
+            try:
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            except (OSError, ValueError):
+                return None
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            media_type = mimetypes.guess_type(path)[0] or "text/plain"
+            response = FileResponse(
+                full_path,
+                stat_result=stat_result,
+                media_type=media_type,
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            )
+            if self.is_not_modified(response.headers, Headers(scope=scope)):
+                return Response(status_code=304, headers={
+                    name: value for name, value in response.headers.items()
+                    if name in ("etag", "cache-control", "vary", "content-encoding")
+                })
+            return response
+        return None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_assets()
@@ -1,8 +1,14 @@
+import argparse
+import importlib.util
+import os
+
 import uvicorn
 from frontend.app import app as frontend_app
+from frontend.assets import build_assets, is_production
 from daas_api import app as api_app
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 # Create main application
 app = FastAPI()
@@ -16,14 +22,56 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if is_production():
+    # Compress JSON and HTML; precompressed static assets pass through as-is
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # Mount both apps
 app.mount("/api", api_app)
 app.mount("/", frontend_app)
 
-if __name__ == "__main__":
-    uvicorn.run(
-        "run:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True  # Enable auto-reload
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def server_options(production: bool, workers: int, host: str, port: int) -> dict:
+    """uvicorn settings for the development or production profile."""
+    options = {"host": host, "port": port}
+    if not production:
+        options["reload"] = True  # Enable auto-reload
+        return options
+    options.update(
+        workers=workers,
+        # Fall back to the pure-Python implementations when not installed
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        proxy_headers=True,
+        access_log=False,
     )
+    return options
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the DaaS API and frontend")
+    parser.add_argument("--production", action="store_true", default=is_production(),
+                        help="Multi-worker serving with hashed, precompressed assets (or APP_ENV=production)")
+    # The client, fair queue, metric rollups, catalog and webhook hub are
+    # per-process state, so extra workers each hold their own copy
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Worker processes in production (default: WEB_CONCURRENCY or 1)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    args = parser.parse_args(argv)
+
+    if args.production:
+        # Workers (and, with one worker, the re-imported run:app) read the
+        # profile from here; asset URLs resolve it lazily on first render
+        os.environ["APP_ENV"] = "production"
+        build_assets()
+
+    uvicorn.run("run:app", **server_options(args.production, args.workers, args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
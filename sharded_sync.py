@@ -0,0 +1,206 @@
+"""
+Multi-process sharded bulk sync. Connection ids are partitioned across
+worker processes; each worker runs its own event loop and pooled
+AirbyteApiClient, all workers draw from one shared rate budget, and
+finished SyncJobs are streamed back to the aggregating parent. Completion
+webhooks received by the parent are routed to the worker syncing that
+connection.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from airbyte_manage import AirbyteApiClient, SyncJob
+from sync_notifications import SyncNotification, SyncNotificationHub
+
+# Workers are spawned rather than forked so they never inherit the parent's
+# scheduler thread, event loop or open aiohttp session.
+_ctx = multiprocessing.get_context("spawn")
+
+
+class SharedRateBudget:
+    """Process-safe request budget shared by every shard worker.
+
+    Each acquire() reserves the next free slot on a global timeline spaced
+    1/rate seconds apart, so the fleet as a whole never exceeds the rate.
+    """
+
+    def __init__(self, rate_per_second: float):
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        self.interval = 1.0 / rate_per_second
+        self._next_slot = _ctx.Value("d", 0.0)
+
+    def reserve(self) -> float:
+        """Reserve a slot and return how long to wait before using it."""
+        with self._next_slot.get_lock():
+            now = time.monotonic()
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + self.interval
+        return slot - now
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class NotificationRouter:
+    """Forwards completion notifications received in the parent (e.g. by a
+    WebhookReceiver) to the shard worker syncing that connection."""
+
+    def __init__(self):
+        self._routes: Dict[str, Any] = {}
+
+    def add_shard(self, shard: Sequence[str]):
+        """Queue the worker for ``shard`` reads its notifications from."""
+        notifications = _ctx.Queue()
+        for connection_id in shard:
+            self._routes[connection_id] = notifications
+        return notifications
+
+    def publish(self, notification: SyncNotification) -> int:
+        """Forward to the owning worker; returns the number of workers reached."""
+        notifications = self._routes.get(notification.connection_id)
+        if notifications is None:
+            return 0
+        notifications.put(notification)
+        return 1
+
+
+def shard_connection_ids(connection_ids: Sequence[str], shards: int) -> List[List[str]]:
+    """Round-robin partition so each shard gets a similar mix of connections."""
+    return [list(connection_ids[i::shards]) for i in range(shards) if connection_ids[i::shards]]
+
+
+async def _forward_notifications(notifications, hub: SyncNotificationHub) -> None:
+    """Publish notifications routed from the parent into this worker's hub."""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            notification = await loop.run_in_executor(None, notifications.get, True, 0.5)
+        except queue.Empty:
+            continue
+        hub.publish(notification)
+
+
+async def _drain_shard(
+    shard: List[str],
+    client_kwargs: Dict[str, Any],
+    max_concurrent: int,
+    budget: Optional[SharedRateBudget],
+    results,
+    notifications=None
+) -> None:
+    client = AirbyteApiClient(rate_limiter=budget, **client_kwargs)
+    async with client:
+        forwarder = None
+        if notifications is not None:
+            forwarder = asyncio.ensure_future(
+                _forward_notifications(notifications, client.sync_notifications)
+            )
+        try:
+            async for job in client.iter_bulk_sync(shard, max_concurrent):
+                results.put((os.getpid(), job))
+        finally:
+            if forwarder is not None:
+                forwarder.cancel()
+
+
+def _shard_worker(shard, client_kwargs, max_concurrent, budget, results, notifications=None) -> None:
+    try:
+        asyncio.run(_drain_shard(shard, client_kwargs, max_concurrent, budget, results, notifications))
+    finally:
+        results.put((os.getpid(), None))
+
+
+def _next_event(results, workers: Dict[int, Any], backlog: List) -> Optional[tuple]:
+    """Next (pid, job) from the workers; job None means that worker is done."""
+    if backlog:
+        return backlog.pop(0)
+    try:
+        return results.get(timeout=1)
+    except queue.Empty:
+        pass
+    dead = next((pid for pid, (w, _) in workers.items() if not w.is_alive()), None)
+    if dead is None:
+        return None
+    # A worker may flush its last jobs and sentinel, then exit, between the
+    # timeout and the liveness check; deliver those before failing its ids
+    while True:
+        try:
+            backlog.append(results.get_nowait())
+        except queue.Empty:
+            break
+    return backlog.pop(0) if backlog else (dead, None)
+
+
+def _collect_results(results, workers: Dict[int, Any]) -> Iterator[SyncJob]:
+    backlog: List = []
+    while workers:
+        event = _next_event(results, workers, backlog)
+        if event is None:
+            continue
+        pid, job = event
+        if pid not in workers:
+            continue
+        worker, remaining = workers[pid]
+        if job is not None:
+            remaining.discard(job.connection_id)
+            yield job
+            continue
+
+        worker.join()
+        del workers[pid]
+        now = datetime.utcnow()
+        for connection_id in remaining:
+            yield SyncJob(
+                connection_id=connection_id,
+                status="ERROR",
+                start_time=now,
+                end_time=now,
+                error=f"shard worker exited with code {worker.exitcode}"
+            )
+
+
+def iter_sharded_bulk_sync(
+    connection_ids: Sequence[str],
+    processes: Optional[int] = None,
+    max_concurrent: int = 5,
+    rate_limit_per_second: Optional[float] = None,
+    client_kwargs: Optional[Dict[str, Any]] = None,
+    router: Optional[NotificationRouter] = None
+) -> Iterator[SyncJob]:
+    """Yield SyncJobs from all shard workers as they finish.
+
+    ``max_concurrent`` applies per worker. Connections whose worker dies
+    before reporting are yielded as ERROR jobs so every id is accounted for.
+    Notifications published to ``router`` resolve the workers' waiters, so
+    with a ``webhook_timeout`` in client_kwargs they only poll as a fallback.
+    """
+    processes = processes or os.cpu_count() or 1
+    shards = shard_connection_ids(list(connection_ids), processes)
+    budget = SharedRateBudget(rate_limit_per_second) if rate_limit_per_second else None
+    results = _ctx.Queue()
+
+    workers = {}
+    for shard in shards:
+        notifications = router.add_shard(shard) if router is not None else None
+        worker = _ctx.Process(
+            target=_shard_worker,
+            args=(shard, client_kwargs or {}, max_concurrent, budget, results, notifications),
+            daemon=True
+        )
+        worker.start()
+        workers[worker.pid] = (worker, set(shard))
+
+    try:
+        yield from _collect_results(results, workers)
+    finally:
+        for worker, _ in workers.values():
+            worker.terminate()
@@ -0,0 +1,337 @@
+"""
+Push-based sync completion. Airbyte webhook notifications are verified,
+deduplicated and resolved against in-process waiters so running syncs no
+longer need a status poll every few seconds. Processes that wait on syncs
+without serving the DaaS API (the CLI) run an embedded receiver. Includes
+a local stand-in emitter for exercising a receiver without an Airbyte
+deployment.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import aiohttp
+import cachetools
+from aiohttp import web
+
+SIGNATURE_HEADER = "X-Airbyte-Signature"
+DELIVERY_HEADER = "X-Delivery-Id"
+RECEIVER_PATH = "/webhooks/airbyte/sync"
+
+
+class WebhookRejected(Exception):
+    """A webhook delivery that failed verification or parsing."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class SyncNotification:
+    connection_id: str
+    status: str
+    job_id: Optional[str] = None
+    records_synced: int = 0
+    delivery_id: Optional[str] = None
+    received_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def dedup_key(self) -> Optional[str]:
+        """Identity of a delivery; None (never deduplicated) when neither a
+        delivery id nor a job id tells two syncs of a connection apart."""
+        if self.delivery_id:
+            return self.delivery_id
+        if self.job_id is None:
+            return None
+        return f"{self.connection_id}:{self.job_id}:{self.status}"
+
+    def as_status(self) -> Dict[str, Any]:
+        """Same shape as the poller's result for _wait_for_sync_completion."""
+        return {
+            "status": self.status,
+            "latest_status": {"jobId": self.job_id, "recordsSynced": self.records_synced},
+        }
+
+
+def sign_payload(body: bytes, secret: str) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(
+    body: bytes,
+    secret: str,
+    signature: Optional[str] = None,
+    token: Optional[str] = None
+) -> bool:
+    """Accept an HMAC-SHA256 body signature or, for Airbyte's plain webhook
+    URLs, the shared secret passed as a ``token`` query parameter."""
+    if signature:
+        return hmac.compare_digest(signature, sign_payload(body, secret))
+    if token:
+        return hmac.compare_digest(token, secret)
+    return False
+
+
+def _job_id(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def parse_notification(payload: Dict[str, Any], delivery_id: Optional[str] = None) -> SyncNotification:
+    """Parse an Airbyte sync webhook or the flat stand-in emitter format."""
+    data = payload.get("data")
+    if isinstance(data, dict):
+        success = data.get("success")
+        if success is None:
+            success = not data.get("errorMessage")
+        return SyncNotification(
+            connection_id=data["connection"]["id"],
+            status="SUCCEEDED" if success else "FAILED",
+            job_id=_job_id(data.get("jobId")),
+            records_synced=int(data.get("recordsCommitted", data.get("recordsEmitted", 0)) or 0),
+            delivery_id=delivery_id,
+        )
+    return SyncNotification(
+        connection_id=payload["connectionId"],
+        status=payload["status"].upper(),
+        job_id=_job_id(payload.get("jobId")),
+        records_synced=int(payload.get("recordsSynced", 0) or 0),
+        delivery_id=delivery_id,
+    )
+
+
+def read_webhook(
+    body: bytes,
+    secret: str,
+    signature: Optional[str] = None,
+    token: Optional[str] = None,
+    delivery_id: Optional[str] = None
+) -> SyncNotification:
+    """Verify and parse one webhook delivery; raises WebhookRejected."""
+    if not verify_signature(body, secret, signature, token):
+        raise WebhookRejected(401, "Invalid webhook signature")
+    try:
+        return parse_notification(json.loads(body), delivery_id=delivery_id)
+    except (KeyError, TypeError, AttributeError, ValueError):
+        raise WebhookRejected(422, "Not a sync completion notification")
+
+
+def webhook_receipt(notification: SyncNotification, resolved: Optional[int]) -> Dict[str, Any]:
+    return {
+        "connection_id": notification.connection_id,
+        "duplicate": resolved is None,
+        "resolved": resolved or 0
+    }
+
+
+class SyncNotificationHub:
+    """Matches completion notifications to pending sync waiters."""
+
+    def __init__(self, dedup_ttl: int = 3600, maxsize: int = 100000):
+        self._waiters: Dict[str, List[tuple]] = defaultdict(list)
+        self._seen = cachetools.TTLCache(maxsize=maxsize, ttl=dedup_ttl)
+        # Latest completion per connection, for waiters registered late
+        self._recent = cachetools.TTLCache(maxsize=maxsize, ttl=dedup_ttl)
+        self._subscribers: List[Callable[[SyncNotification], Any]] = []
+
+    @staticmethod
+    def _matches(notification: SyncNotification, job_id: Optional[str], since: Optional[datetime]) -> bool:
+        if job_id is not None and notification.job_id is not None:
+            return notification.job_id == job_id
+        return since is None or notification.received_at >= since
+
+    def register(
+        self,
+        connection_id: str,
+        job_id: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> asyncio.Future:
+        """Return a future resolved by the matching completion notification.
+
+        ``job_id`` pins the waiter to one job; otherwise any completion
+        received after ``since`` resolves it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        recent = self._recent.get(connection_id)
+        pinned = job_id is not None or since is not None
+        if recent is not None and pinned and self._matches(recent, _job_id(job_id), since):
+            future.set_result(recent)
+        else:
+            self._waiters[connection_id].append((_job_id(job_id), since, future))
+        return future
+
+    def unregister(self, connection_id: str, future: asyncio.Future) -> None:
+        waiters = [w for w in self._waiters.get(connection_id, []) if w[2] is not future]
+        if waiters:
+            self._waiters[connection_id] = waiters
+        else:
+            self._waiters.pop(connection_id, None)
+
+    def subscribe(self, callback: Callable[[SyncNotification], Any]) -> None:
+        """Also hand every non-duplicate notification to ``callback``."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[SyncNotification], Any]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(self, notification: SyncNotification) -> Optional[int]:
+        """Resolve matching waiters; returns None for duplicate deliveries."""
+        key = notification.dedup_key
+        if key is not None:
+            if key in self._seen:
+                return None
+            self._seen[key] = True
+        self._recent[notification.connection_id] = notification
+        for callback in list(self._subscribers):
+            callback(notification)
+
+        resolved, remaining = 0, []
+        for job_id, since, future in self._waiters.pop(notification.connection_id, []):
+            if future.done():
+                continue
+            if self._matches(notification, job_id, since):
+                future.set_result(notification)
+                resolved += 1
+            else:
+                remaining.append((job_id, since, future))
+        if remaining:
+            self._waiters[notification.connection_id] = remaining
+        return resolved
+
+    def pending(self) -> int:
+        return sum(len(w) for w in self._waiters.values())
+
+
+class WebhookReceiver:
+    """Embedded webhook endpoint for a process that waits on syncs.
+
+    Verified notifications are passed to ``publish``, e.g. a client's
+    ``sync_notifications.publish``. Point Airbyte's webhook at ``url``.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[SyncNotification], Optional[int]],
+        secret: str,
+        host: str = "0.0.0.0",
+        port: int = 8765,
+        path: str = RECEIVER_PATH
+    ):
+        self.publish = publish
+        self.secret = secret
+        self.host = host
+        self.port = port
+        self.path = path
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        try:
+            notification = read_webhook(
+                await request.read(),
+                self.secret,
+                request.headers.get(SIGNATURE_HEADER),
+                request.query.get("token"),
+                request.headers.get(DELIVERY_HEADER)
+            )
+        except WebhookRejected as e:
+            return web.json_response({"detail": e.detail}, status=e.status_code)
+        return web.json_response(webhook_receipt(notification, self.publish(notification)))
+
+    @property
+    def url(self) -> str:
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}{self.path}"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post(self.path, self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    @contextmanager
+    def in_thread(self) -> Iterator["WebhookReceiver"]:
+        """Serve from a background thread, for callers without an event loop.
+
+        ``publish`` is then called from that thread.
+        """
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        errors: List[BaseException] = []
+
+        def serve() -> None:
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as e:
+                errors.append(e)
+                ready.set()
+                loop.close()
+                return
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        thread = threading.Thread(target=serve, name="webhook-receiver", daemon=True)
+        thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        try:
+            yield self
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+
+
+class WebhookEmitter:
+    """Local stand-in for Airbyte: posts signed completion notifications."""
+
+    def __init__(self, url: str, secret: str):
+        self.url = url
+        self.secret = secret
+
+    async def emit(
+        self,
+        connection_id: str,
+        status: str = "SUCCEEDED",
+        job_id: Optional[Any] = None,
+        records_synced: int = 0
+    ) -> Dict[str, Any]:
+        body = json.dumps({
+            "connectionId": connection_id,
+            "status": status,
+            "jobId": job_id,
+            "recordsSynced": records_synced,
+        }).encode()
+        headers = {
+            "Content-Type": "application/json",
+            SIGNATURE_HEADER: sign_payload(body, self.secret),
+        }
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.url, data=body, headers=headers) as response:
+                response.raise_for_status()
+                return await response.json()
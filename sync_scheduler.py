@@ -0,0 +1,235 @@
+"""
+Load-aware sync scheduling. Learns each connection's typical duration and
+volume, then staggers start offsets over a one-day minute timeline so peak
+concurrent syncs, API polling load and warehouse volume stay under caps.
+"""
+
+import math
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+
+_UNIT_MINUTES = {"minutes": 1, "hours": 60, "days": MINUTES_PER_DAY}
+
+
+@dataclass
+class ConnectionProfile:
+    connection_id: str
+    period_minutes: int
+    expected_duration: float  # seconds
+    expected_records: float = 0.0
+    samples: int = 0
+
+
+@dataclass
+class ScheduleEntry:
+    connection_id: str
+    period_minutes: int
+    offset_minutes: int
+    cron_expression: str
+    expected_duration: float
+
+    def schedule_data(self) -> Dict[str, Any]:
+        """Airbyte ``scheduleData`` payload for a cron schedule."""
+        return {
+            "cron": {
+                "cronExpression": self.cron_expression,
+                "cronTimeZone": "UTC",
+            }
+        }
+
+
+class SyncHistory:
+    """Exponentially weighted duration and volume per connection."""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self._stats: Dict[str, Tuple[float, float, int]] = {}
+
+    def observe(self, connection_id: str, duration: float, records: float) -> None:
+        previous = self._stats.get(connection_id)
+        if previous is None:
+            self._stats[connection_id] = (duration, records, 1)
+            return
+        mean_duration, mean_records, samples = previous
+        self._stats[connection_id] = (
+            mean_duration + self.alpha * (duration - mean_duration),
+            mean_records + self.alpha * (records - mean_records),
+            samples + 1,
+        )
+
+    def observe_job(self, job) -> None:
+        """Learn from a finished ``SyncJob``."""
+        if job.end_time is None or job.error is not None:
+            return
+        duration = (job.end_time - job.start_time).total_seconds()
+        self.observe(job.connection_id, duration, job.records_synced)
+
+    def get(self, connection_id: str) -> Optional[Tuple[float, float, int]]:
+        return self._stats.get(connection_id)
+
+    def __contains__(self, connection_id: str) -> bool:
+        return connection_id in self._stats
+
+
+def parse_period_minutes(connection: Dict[str, Any]) -> Optional[int]:
+    """Extract a basic schedule's period in minutes, or None if not basic."""
+    schedule = (connection.get("scheduleData") or {}).get("basicSchedule")
+    if schedule is None and connection.get("scheduleType") in (None, "basic"):
+        schedule = connection.get("schedule")
+    if not schedule:
+        return None
+    unit = _UNIT_MINUTES.get(schedule.get("timeUnit"))
+    if unit is None:
+        return None
+    return int(schedule.get("units", 1)) * unit
+
+
+def is_schedulable_period(period: int) -> bool:
+    """Periods expressible as a fixed-offset cron on a daily timeline."""
+    if period <= 0:
+        return False
+    if period <= 60:
+        return 60 % period == 0
+    return period % 60 == 0 and MINUTES_PER_DAY % period == 0
+
+
+def cron_expression(period: int, offset: int) -> str:
+    """Quartz cron (as used by Airbyte) for a period and start offset."""
+    minute, hour = offset % 60, offset // 60
+    if period < 60:
+        return f"0 {minute}/{period} * * * ?"
+    if period == 60:
+        return f"0 {minute} * * * ?"
+    if period < MINUTES_PER_DAY:
+        return f"0 {minute} {hour}/{period // 60} * * ?"
+    return f"0 {minute} {hour} * * ?"
+
+
+class LoadAwareScheduler:
+    """Greedy staggering of periodic syncs under concurrency and API caps.
+
+    Connections are placed longest-first; each takes the start offset that
+    minimizes the resulting peak load (normalized against the caps) over
+    every minute it occupies on the daily timeline.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_syncs: int = 10,
+        max_api_calls_per_minute: int = 600,
+        max_records_per_minute: Optional[float] = None,
+        polls_per_minute: int = 6,
+        slot_minutes: int = 1,
+        daily_window: Optional[Tuple[int, int]] = None,
+        default_duration: float = 300.0
+    ):
+        self.max_concurrent_syncs = max_concurrent_syncs
+        self.max_api_calls_per_minute = max_api_calls_per_minute
+        self.max_records_per_minute = max_records_per_minute
+        self.polls_per_minute = polls_per_minute
+        self.slot_minutes = slot_minutes
+        self.daily_window = daily_window
+        self.default_duration = default_duration
+
+    def _candidates(self, period: int) -> np.ndarray:
+        if period >= MINUTES_PER_DAY and self.daily_window:
+            start, end = self.daily_window
+            span = (end - start) % MINUTES_PER_DAY or MINUTES_PER_DAY
+            return (start + np.arange(0, span, self.slot_minutes)) % MINUTES_PER_DAY
+        return np.arange(0, period, self.slot_minutes)
+
+    @staticmethod
+    def _footprint(profile: ConnectionProfile) -> Tuple[np.ndarray, int]:
+        """Minutes occupied at offset 0, and run length in minutes."""
+        period = profile.period_minutes
+        duration = min(period, max(1, math.ceil(profile.expected_duration / 60)))
+        starts = np.arange(0, MINUTES_PER_DAY, period)
+        return (starts[:, None] + np.arange(duration)[None, :]).ravel(), duration
+
+    def _add_load(self, loads: Dict[str, np.ndarray], minutes: np.ndarray,
+                  duration: int, profile: ConnectionProfile) -> None:
+        loads["syncs"][minutes] += 1
+        loads["api"][minutes] += self.polls_per_minute
+        loads["api"][minutes[::duration]] += 1  # the trigger call
+        loads["records"][minutes] += profile.expected_records / duration
+
+    def _place(self, loads: Dict[str, np.ndarray], profile: ConnectionProfile) -> int:
+        occupied, duration = self._footprint(profile)
+        candidates = self._candidates(profile.period_minutes)
+        minutes = (candidates[:, None] + occupied[None, :]) % MINUTES_PER_DAY
+        records_per_minute = profile.expected_records / duration
+
+        pressure = (loads["syncs"][minutes] + 1) / self.max_concurrent_syncs
+        pressure = np.maximum(
+            pressure,
+            (loads["api"][minutes] + self.polls_per_minute + 1) / self.max_api_calls_per_minute
+        )
+        if self.max_records_per_minute:
+            pressure = np.maximum(
+                pressure,
+                (loads["records"][minutes] + records_per_minute) / self.max_records_per_minute
+            )
+        # Lowest peak wins; ties go to the offset with the least total load
+        best = np.lexsort((pressure.mean(axis=1), pressure.max(axis=1)))[0]
+        self._add_load(loads, minutes[best], duration, profile)
+        return int(candidates[best])
+
+    def _peaks(self, loads: Dict[str, np.ndarray]) -> Dict[str, float]:
+        return {
+            "peak_concurrent_syncs": int(loads["syncs"].max()),
+            "peak_api_calls_per_minute": int(loads["api"].max()),
+            "peak_records_per_minute": float(loads["records"].max()),
+        }
+
+    def _empty_loads(self) -> Dict[str, np.ndarray]:
+        return {
+            "syncs": np.zeros(MINUTES_PER_DAY, dtype=np.int32),
+            "api": np.zeros(MINUTES_PER_DAY, dtype=np.int32),
+            "records": np.zeros(MINUTES_PER_DAY, dtype=np.float64),
+        }
+
+    def baseline(self, profiles: Sequence[ConnectionProfile]) -> Dict[str, float]:
+        """Peak loads if every connection fires at offset 0 (the default)."""
+        loads = self._empty_loads()
+        for profile in profiles:
+            occupied, duration = self._footprint(profile)
+            self._add_load(loads, occupied, duration, profile)
+        return self._peaks(loads)
+
+    def plan(self, profiles: Sequence[ConnectionProfile]) -> Dict[str, Any]:
+        """Compute staggered start offsets and the resulting peak loads."""
+        schedulable = [p for p in profiles if is_schedulable_period(p.period_minutes)]
+        ordered = sorted(
+            schedulable,
+            key=lambda p: (p.expected_duration / p.period_minutes, p.expected_records),
+            reverse=True
+        )
+        loads = self._empty_loads()
+        schedules = []
+        for profile in ordered:
+            offset = self._place(loads, profile)
+            schedules.append(ScheduleEntry(
+                connection_id=profile.connection_id,
+                period_minutes=profile.period_minutes,
+                offset_minutes=offset,
+                cron_expression=cron_expression(profile.period_minutes, offset),
+                expected_duration=profile.expected_duration,
+            ))
+
+        peaks = self._peaks(loads)
+        return {
+            "schedules": [asdict(entry) for entry in schedules],
+            "skipped": [p.connection_id for p in profiles if p not in schedulable],
+            "before": self.baseline(schedulable),
+            "after": peaks,
+            "within_caps": (
+                peaks["peak_concurrent_syncs"] <= self.max_concurrent_syncs
+                and peaks["peak_api_calls_per_minute"] <= self.max_api_calls_per_minute
+                and (not self.max_records_per_minute
+                     or peaks["peak_records_per_minute"] <= self.max_records_per_minute)
+            ),
+        }
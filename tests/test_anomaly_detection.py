@@ -0,0 +1,81 @@
+import pytest
+from datetime import datetime, timedelta
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from airbyte_manage import AirbyteApiClient, SyncJob
+from anomaly_detection import SyncMetricsStore
+from sync_notifications import SyncNotification
+
+def _feed(store, connection_id, durations, records=1000):
+    for duration in durations:
+        store.update(connection_id, duration, records)
+
+def test_update_tracks_ewma_and_totals():
+    store = SyncMetricsStore(alpha=0.5)
+    store.update("conn1", 10.0, 100)
+    store.update("conn1", 20.0, 300)
+    assert store.mean[0, 0] == pytest.approx(15.0)
+    summary = store.summary(["conn1"])
+    assert summary["syncs_observed"] == 2
+    assert summary["records_synced"] == 400
+    assert summary["per_connection"]["conn1"]["last_duration"] == 20.0
+
+def test_detects_duration_spike():
+    store = SyncMetricsStore()
+    _feed(store, "steady", [60, 62, 58, 61, 59, 60, 61, 60, 62, 59, 60])
+    _feed(store, "spiky", [60, 62, 58, 61, 59, 60, 61, 60, 62, 59, 600])
+    anomalies = store.detect()
+    assert {(a["connection_id"], a["metric"]) for a in anomalies if a["metric"] == "duration"} == {("spiky", "duration")}
+
+def test_detects_throughput_drift():
+    store = SyncMetricsStore(alpha=0.5, drift_alpha=0.01)
+    _feed(store, "conn1", [10] * 5, records=1000)
+    _feed(store, "conn1", [10] * 5, records=100)
+    drift = [a for a in store.detect() if a["metric"] == "records_per_second_drift"]
+    assert drift and drift[0]["drift"] < -0.5
+
+def test_store_grows_and_skips_errored_jobs():
+    store = SyncMetricsStore(capacity=2)
+    start = datetime(2024, 1, 1)
+    for i in range(5):
+        store.update_job(SyncJob(f"conn{i}", "SUCCEEDED", start, start + timedelta(seconds=5), 10))
+    store.update_job(SyncJob("failed", "ERROR", start, start, error="boom"))
+    assert len(store) == 5
+    assert "failed" not in store
+    assert store.summary()["records_synced"] == 50
+
+@pytest.mark.asyncio
+async def test_client_metrics_are_seeded_from_job_history():
+    durations = [60, 62, 58, 61, 59, 60, 61, 60, 62, 59, 600]
+    jobs = [
+        {"job": {"id": i, "status": "succeeded", "createdAt": 0, "updatedAt": d},
+         "attempts": [{"attempt": {"recordsSynced": 1000}}]}
+        for i, d in enumerate(durations, start=1)
+    ]
+    listings = []
+
+    async def list_jobs(request):
+        listings.append(await request.json())
+        return web.json_response({"jobs": list(reversed(jobs))})  # newest first
+
+    app = web.Application()
+    app.router.add_post("/jobs/list", list_jobs)
+    async with TestServer(app) as server:
+        client = AirbyteApiClient(base_url=str(server.make_url("")).rstrip("/"), username="u", password="p")
+        async with client:
+            metrics = await client._collect_advanced_metrics(["conn1"])
+            assert metrics["per_connection"]["conn1"]["syncs"] == 11
+            assert "duration" in {a["metric"] for a in client._detect_anomalies(metrics)}
+
+            # Within the TTL the history is not re-read...
+            await client._collect_advanced_metrics(["conn1"])
+            assert len(listings) == 1
+
+            # ...until a completion webhook says a sync finished
+            jobs.append({"job": {"id": 12, "status": "succeeded", "createdAt": 0, "updatedAt": 60},
+                         "attempts": [{"attempt": {"recordsSynced": 1000}}]})
+            client.sync_notifications.publish(SyncNotification("conn1", "SUCCEEDED", job_id="12"))
+            metrics = await client._collect_advanced_metrics(["conn1"])
+            assert len(listings) == 2
+            assert metrics["per_connection"]["conn1"]["syncs"] == 12
+            assert metrics["per_connection"]["conn1"]["records_synced"] == 12000
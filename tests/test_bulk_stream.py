@@ -0,0 +1,58 @@
+import pytest
+import json
+from datetime import datetime, timedelta
+from airbyte_manage import SyncJob
+from bulk_stream import read_connection_ids, count_entries, JsonlSink, SyncCheckpoint
+
+def _job(connection_id, status="SUCCEEDED", error=None):
+    start = datetime(2024, 1, 1)
+    return SyncJob(
+        connection_id=connection_id,
+        status=status,
+        start_time=start,
+        end_time=start + timedelta(seconds=30),
+        records_synced=10,
+        error=error
+    )
+
+def test_read_yaml_connections(tmp_path):
+    path = tmp_path / "connections.yaml"
+    path.write_text("connections:\n  - conn1\n  - connection_id: conn2\n")
+    assert list(read_connection_ids(str(path))) == ["conn1", "conn2"]
+
+def test_read_jsonl_connections(tmp_path):
+    path = tmp_path / "connections.jsonl"
+    path.write_text('{"connectionId": "conn1"}\n"conn2"\n\nconn3\n')
+    assert list(read_connection_ids(str(path))) == ["conn1", "conn2", "conn3"]
+    assert count_entries(str(path)) == 3
+
+def test_read_json_connections(tmp_path):
+    path = tmp_path / "connections.json"
+    path.write_text('[\n  "conn1",\n  {"connectionId": "conn2"}\n]\n')
+    assert list(read_connection_ids(str(path))) == ["conn1", "conn2"]
+    path.write_text('["conn1", "conn2"]')
+    assert list(read_connection_ids(str(path))) == ["conn1", "conn2"]
+
+def test_malformed_jsonl_line_raises(tmp_path):
+    path = tmp_path / "connections.jsonl"
+    path.write_text('conn1\n{"connectionId": \n')
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_connection_ids(str(path)))
+
+def test_sink_writes_records(tmp_path):
+    path = tmp_path / "results.jsonl"
+    with JsonlSink(str(path)) as sink:
+        sink.write(_job("conn1"))
+    record = json.loads(path.read_text())
+    assert record["connection_id"] == "conn1"
+    assert record["duration"] == 30.0
+
+def test_checkpoint_resume(tmp_path):
+    path = str(tmp_path / "checkpoint")
+    with SyncCheckpoint(path) as checkpoint:
+        checkpoint.mark(_job("conn1"))
+        checkpoint.mark(_job("conn2", status="ERROR", error="boom"))
+
+    with SyncCheckpoint(path) as checkpoint:
+        assert "conn1" in checkpoint
+        assert list(checkpoint.pending(["conn1", "conn2", "conn3"])) == ["conn2", "conn3"]
@@ -0,0 +1,123 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from airbyte_manage import AirbyteApiClient
+from catalog import WorkspaceCatalog
+
+class FakeClient:
+    def __init__(self):
+        self.lists = 0
+        self.workspace = {
+            "sources": [
+                {"sourceId": "s1", "name": "orders_db", "sourceDefinitionId": "postgres"},
+                {"sourceId": "s2", "name": "crm", "sourceDefinitionId": "salesforce"},
+            ],
+            "destinations": [
+                {"destinationId": "d1", "name": "warehouse", "destinationDefinitionId": "snowflake"},
+            ],
+            "connections": [
+                {"connectionId": "c1", "name": "orders", "sourceId": "s1", "destinationId": "d1"},
+                {"connectionId": "c2", "name": "accounts", "sourceId": "s2", "destinationId": "d1"},
+                {"connectionId": "c3", "name": "orders", "sourceId": "s1", "destinationId": "d1"},
+            ],
+        }
+
+    def _iter(self, kind):
+        async def items():
+            self.lists += 1
+            for item in list(self.workspace[kind]):
+                yield dict(item)
+        return items()
+
+    def iter_sources(self, workspace_id, page_size=100):
+        return self._iter("sources")
+
+    def iter_destinations(self, workspace_id, page_size=100):
+        return self._iter("destinations")
+
+    def iter_connections(self, workspace_id, page_size=100):
+        return self._iter("connections")
+
+def _ids(items, key="connectionId"):
+    return sorted(item[key] for item in items)
+
+@pytest.mark.asyncio
+async def test_catalog_indexes():
+    catalog = WorkspaceCatalog(FakeClient(), "ws")
+    changes = await catalog.refresh()
+    assert changes["connections"] == {"added": 3, "updated": 0, "removed": 0}
+    assert len(catalog) == 6
+
+    assert catalog.connection("c2")["name"] == "accounts"
+    assert _ids(catalog.find("connections", name="orders")) == ["c1", "c3"]
+    assert _ids(catalog.connections_for_source("s1")) == ["c1", "c3"]
+    assert _ids(catalog.connections_for_destination("d1")) == ["c1", "c2", "c3"]
+    assert _ids(catalog.connections_for_definition("salesforce")) == ["c2"]
+    assert _ids(catalog.find("sources", definition="postgres"), "sourceId") == ["s1"]
+    assert _ids(catalog.find_connections(definition="postgres", name="orders")) == ["c1", "c3"]
+    assert catalog.find("connections", name="missing") == []
+    with pytest.raises(ValueError):
+        catalog.find("connections", definition="postgres")
+
+@pytest.mark.asyncio
+async def test_catalog_incremental_refresh():
+    client = FakeClient()
+    catalog = WorkspaceCatalog(client, "ws")
+    await catalog.refresh()
+
+    connections = client.workspace["connections"]
+    connections[0] = {**connections[0], "sourceId": "s2"}
+    del connections[2]
+    connections.append({"connectionId": "c4", "name": "leads", "sourceId": "s2", "destinationId": "d1"})
+
+    changes = await catalog.refresh()
+    assert changes["connections"] == {"added": 1, "updated": 1, "removed": 1}
+    assert changes["sources"] == {"added": 0, "updated": 0, "removed": 0}
+    assert catalog.connection("c3") is None
+    assert _ids(catalog.connections_for_source("s1")) == []
+    assert _ids(catalog.connections_for_source("s2")) == ["c1", "c2", "c4"]
+    assert _ids(catalog.find("connections", name="orders")) == ["c1"]
+
+@pytest.mark.asyncio
+async def test_catalog_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "catalog.json")
+    client = FakeClient()
+    catalog = WorkspaceCatalog(client, "ws", snapshot_path=path)
+    await catalog.ensure_loaded()
+    assert client.lists == 3
+
+    warm_client = FakeClient()
+    warm = await WorkspaceCatalog(warm_client, "ws", snapshot_path=path).ensure_loaded()
+    assert warm_client.lists == 0
+    assert warm.refreshed_at == catalog.refreshed_at
+    assert _ids(warm.connections_for_source("s1")) == ["c1", "c3"]
+
+    # A snapshot of another workspace is not used
+    other = WorkspaceCatalog(FakeClient(), "other", snapshot_path=path)
+    assert not other.load_snapshot()
+
+@pytest.mark.asyncio
+async def test_get_all_connections_from_catalog():
+    calls = []
+
+    async def list_endpoint(request):
+        kind = request.path.split("/")[1]
+        calls.append(kind)
+        key = {"sources": "sourceId", "destinations": "destinationId", "connections": "connectionId"}[kind]
+        return web.json_response({kind: [{key: f"{kind}-1", "name": kind}]})
+
+    app = web.Application()
+    for kind in ("sources", "destinations", "connections"):
+        app.router.add_post(f"/{kind}/list", list_endpoint)
+    async with TestServer(app) as server:
+        client = AirbyteApiClient(
+            base_url=str(server.make_url("")).rstrip("/"),
+            username="test",
+            password="test",
+            enterprise_config={"catalog": {"refresh_interval": None}}
+        )
+        async with client:
+            assert await client.get_all_connections("ws") == ["connections-1"]
+            assert await client.get_all_connections("ws") == ["connections-1"]
+
+    assert calls == ["sources", "destinations", "connections"]
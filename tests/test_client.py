@@ -2,7 +2,10 @@ import pytest
 import asyncio
 from unittest.mock import Mock, patch, AsyncMock
 from datetime import datetime
-from airbyte_manage import AirbyteApiClient, ConnectionStatus, SecurityConfig
+from typing import Optional
+from pydantic import BaseModel
+from pydantic import ValidationError
+from airbyte_manage import AirbyteApiClient, ConnectionStatus, SecurityConfig, build_model, decode_json
 
 @pytest.fixture
 def client():
@@ -16,7 +19,7 @@ def client():
 
 @pytest.mark.asyncio
 async def test_create_source(client):
-    with patch.object(client, '_make_request') as mock_request:
+    with patch.object(client, '_make_async_request') as mock_request:
         mock_request.return_value = {"sourceId": "test-source"}
         result = await client.create_source(
             name="test",
@@ -68,3 +71,55 @@ def test_cache_operations(client):
     key = client._cache_key("GET", "test", param="value")
     client.cache.set(key, test_data)
     assert client.cache.get(key) == test_data
+
+def test_build_model_fast_path():
+    payload = decode_json(b'{"status": "running", "last_sync": "2024-01-01T00:00:00Z", "latest_status": {}, "syncCatalog": {}}')
+    status = build_model(ConnectionStatus, payload, validate=False)
+    assert status.status == "running"
+    assert status.last_sync == datetime.fromisoformat("2024-01-01T00:00:00+00:00")
+    assert not hasattr(status, "syncCatalog")
+
+class _JobTimes(BaseModel):
+    started_at: datetime
+    ended_at: Optional[datetime]
+    label: str
+
+def test_build_model_fast_path_parses_every_datetime_field():
+    payload = {"started_at": "2024-01-01T00:00:00Z", "ended_at": 1704067260, "label": "2024-01-01T00:00:00Z"}
+    times = build_model(_JobTimes, payload, validate=False)
+    assert times.started_at == datetime.fromisoformat("2024-01-01T00:00:00+00:00")
+    assert times.ended_at == datetime.fromisoformat("2024-01-01T00:01:00+00:00")
+    assert times.label == "2024-01-01T00:00:00Z"
+
+def test_build_model_projection():
+    payload = {"status": "succeeded", "last_sync": None, "latest_status": {"recordsSynced": 5}}
+    status = build_model(ConnectionStatus, payload, fields=("status", "last_sync"))
+    assert status.status == "succeeded"
+    assert status.last_sync is None
+
+def test_build_model_projection_validates_requested_fields():
+    payload = {"last_sync": "2024-01-01T00:00:00Z", "latest_status": {}}
+    with pytest.raises(ValidationError):
+        build_model(ConnectionStatus, payload, fields=("status", "latest_status"))
+    # Only fast decoding projects without validation
+    status = build_model(ConnectionStatus, payload, fields=("status", "last_sync"), validate=False)
+    assert status.status is None
+    assert status.last_sync == datetime.fromisoformat("2024-01-01T00:00:00+00:00")
+
+    status = build_model(ConnectionStatus, dict(payload, status="running"), fields=("status", "last_sync"))
+    assert status.last_sync == datetime.fromisoformat("2024-01-01T00:00:00+00:00")
+
+@pytest.mark.asyncio
+async def test_scheduled_optimization_failure_is_logged(caplog):
+    client = AirbyteApiClient(base_url="http://test", username="test", password="test")
+    client.auto_optimization = AsyncMock(side_effect=RuntimeError("boom"))
+    try:
+        client.schedule_auto_optimization()
+        client.scheduler.get_job("auto_optimization").func()
+        for _ in range(50):
+            if "boom" in caplog.text:
+                break
+            await asyncio.sleep(0.01)
+        assert "Scheduled auto-optimization failed: boom" in caplog.text
+    finally:
+        await client.__aexit__(None, None, None)
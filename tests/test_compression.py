@@ -0,0 +1,91 @@
+import pytest
+import gzip
+import json
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from airbyte_manage import AirbyteApiClient
+from compression import StreamingDecoder, compress_body
+
+def test_streaming_decoder_gzip_chunks():
+    raw = json.dumps({"sources": [{"name": f"source_{i}"} for i in range(500)]}).encode()
+    compressed = gzip.compress(raw)
+    decoder = StreamingDecoder("gzip")
+    body = b"".join(decoder.feed(compressed[i:i + 100]) for i in range(0, len(compressed), 100))
+    body += decoder.flush()
+    assert body == raw
+    assert decoder.wire_bytes == len(compressed)
+    assert decoder.decoded_bytes == len(raw)
+
+def test_compress_body_threshold():
+    body = b'{"name": "' + b"x" * 5000 + b'"}'
+    assert compress_body(body, None) == (body, {})
+    assert compress_body(b"{}", 1024) == (b"{}", {})
+    compressed, headers = compress_body(body, 1024)
+    assert headers == {"Content-Encoding": "gzip"}
+    assert gzip.decompress(compressed) == body
+
+@pytest.mark.asyncio
+async def test_paginated_reader_over_gzip_transport():
+    sources = [{"sourceId": f"s{i}", "name": f"source_{i}"} for i in range(250)]
+    received = []
+
+    async def list_sources(request):
+        payload = await request.json()
+        received.append((request.headers.get("Content-Encoding"), request.headers.get("Accept-Encoding")))
+        page = sources[payload["offset"]:payload["offset"] + payload["limit"]]
+        body = gzip.compress(json.dumps({"sources": page}).encode())
+        return web.Response(body=body, headers={"Content-Encoding": "gzip", "Content-Type": "application/json"})
+
+    async def create_connection(request):
+        received.append((request.headers.get("Content-Encoding"), request.headers.get("Accept-Encoding")))
+        # aiohttp decodes the gzip request body transparently
+        return web.json_response(await request.json())
+
+    app = web.Application()
+    app.router.add_post("/sources/list", list_sources)
+    app.router.add_post("/connections/create", create_connection)
+    async with TestServer(app) as server:
+        client = AirbyteApiClient(
+            base_url=str(server.make_url("")).rstrip("/"),
+            username="test",
+            password="test",
+            compress_requests_over=1024
+        )
+        result = [s async for s in client.iter_sources("workspace", page_size=100)]
+        catalog = {"streams": [{"name": f"table_{i}"} for i in range(200)]}
+        created = await client._make_async_request(
+            "POST", "connections/create", use_cache=False, json={"syncCatalog": catalog}
+        )
+        await client.session.close()
+
+    assert [s["sourceId"] for s in result] == [s["sourceId"] for s in sources]
+    assert created == {"syncCatalog": catalog}
+    assert [encoding for encoding, _ in received] == [None, None, None, "gzip"]
+    assert all("gzip" in accept for _, accept in received)
+
+@pytest.mark.asyncio
+async def test_paginated_reader_stops_on_non_paginating_endpoint():
+    sources = [{"sourceId": f"s{i}", "name": f"source_{i}"} for i in range(100)]
+    calls = []
+
+    async def list_everything(request):
+        calls.append(request.path)
+        return web.json_response({"sources": sources})
+
+    app = web.Application()
+    # Ignores limit and offset, returning everything on every call
+    app.router.add_post("/sources/list", list_everything)
+    async with TestServer(app) as server:
+        client = AirbyteApiClient(
+            base_url=str(server.make_url("")).rstrip("/"),
+            username="test",
+            password="test"
+        )
+        # Exactly one page's worth: the repeated second page ends the listing
+        exact = [s async for s in client.iter_sources("workspace", page_size=100)]
+        # More than a page: the oversized first page is the whole listing
+        oversized = [s async for s in client.iter_sources("workspace", page_size=30)]
+        await client.session.close()
+
+    assert len(exact) == len(oversized) == 100
+    assert len(calls) == 3
@@ -0,0 +1,97 @@
+import pytest
+import asyncio
+import httpx
+from contextlib import asynccontextmanager
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import daas_api
+from airbyte_manage import AirbyteApiClient
+
+@asynccontextmanager
+async def airbyte():
+    """Stand-in Airbyte API and a real, non-premium client pointed at it."""
+    async def get_connection(request):
+        payload = await request.json()
+        if payload["connectionId"] != "c1":
+            return web.json_response({"message": "not found"}, status=404)
+        return web.json_response({
+            "status": "active",
+            "last_sync": "2024-01-01T00:00:00Z",
+            "latest_status": {}
+        })
+
+    listings = []
+
+    async def list_endpoint(request):
+        listings.append(request.path)
+        if len(listings) == 1:
+            return web.json_response({"message": "unavailable"}, status=503)
+        kind = request.path.split("/")[1]
+        key = {"sources": "sourceId", "destinations": "destinationId", "connections": "connectionId"}[kind]
+        item = {key: f"{kind[0]}1", "name": kind}
+        if kind == "connections":
+            item.update(sourceId="s1", destinationId="d1")
+        return web.json_response({kind: [item]})
+
+    app = web.Application()
+    app.router.add_post("/connections/get", get_connection)
+    for kind in ("sources", "destinations", "connections"):
+        app.router.add_post(f"/{kind}/list", list_endpoint)
+    async with TestServer(app) as server:
+        client = AirbyteApiClient(
+            base_url=str(server.make_url("")).rstrip("/"),
+            username="test",
+            password="test"
+        )
+        daas_api._client, daas_api._service = client, None
+        try:
+            yield client
+        finally:
+            if daas_api._service is not None:
+                daas_api._service.stop_metrics_refresh()
+            daas_api._client, daas_api._service = None, None
+            await client.__aexit__(None, None, None)
+
+def api():
+    transport = httpx.ASGITransport(app=daas_api.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test", headers={"X-API-Key": "key"})
+
+@pytest.mark.asyncio
+async def test_pipeline_metrics_without_premium():
+    async with airbyte() as client, api() as api_client:
+        assert not client.is_premium
+        response = await api_client.get("/api/v1/pipelines/c1/metrics")
+        assert response.status_code == 200
+        assert response.json()["status"] == "active"
+        assert response.json()["performance_metrics"]["anomalies"] == []
+
+        response = await api_client.get("/api/v1/pipelines/missing/metrics")
+        assert response.status_code == 404
+
+        response = await api_client.post("/api/v1/pipelines/metrics/batch", json={"pipeline_ids": ["c1", "missing"]})
+        assert response.status_code == 200
+        results = response.json()
+        assert results["c1"]["status"] == "active"
+        assert "error" in results["missing"]
+        assert daas_api._service._tracked == {"c1"}
+
+@pytest.mark.asyncio
+async def test_service_is_created_once_and_survives_catalog_failure(monkeypatch):
+    monkeypatch.setenv("AIRBYTE_WORKSPACE_ID", "ws")
+    monkeypatch.setattr(daas_api, "CATALOG_RETRY_INTERVAL", 0.01)
+    async with airbyte() as client, api() as api_client:
+        services = await asyncio.gather(*(daas_api.get_service(client) for _ in range(5)))
+        assert len({id(s) for s in services}) == 1
+        assert client.request_queue is services[0].request_queue
+
+        # The first listing fails; the API keeps serving meanwhile
+        response = await api_client.get("/api/v1/pipelines/c1/metrics")
+        assert response.status_code == 200
+
+        for _ in range(100):
+            if services[0].catalog is not None:
+                break
+            await asyncio.sleep(0.01)
+        response = await api_client.get("/api/v1/pipelines/c1")
+        assert response.status_code == 200
+        assert response.json()["source"] == {"id": "s1", "name": "sources"}
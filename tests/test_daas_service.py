@@ -1,6 +1,8 @@
+import asyncio
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
-from daas_service import DataService, DataServiceConfig
+from airbyte_manage import ApiRequestError
+from daas_service import DataService, DataServiceConfig, PipelineNotFound
 
 @pytest.fixture
 def service():
@@ -36,3 +38,184 @@ async def test_pipeline_metrics(service):
     metrics = await service.get_pipeline_metrics("test-pipeline")
     assert "status" in metrics
     assert "records_synced" in metrics
+
+@pytest.mark.asyncio
+async def test_pipeline_metrics_batch_coalesces_and_caches(service):
+    calls = []
+
+    async def check_status(pipeline_id, fields=None):
+        calls.append(pipeline_id)
+        await asyncio.sleep(0)
+        return Mock(status="succeeded", last_sync=None)
+
+    service.client.check_connection_status = check_status
+    service.client.advanced_monitoring = AsyncMock(return_value={
+        "metrics": {"per_connection": {"p1": {"records_synced": 10}}},
+        "anomalies": [{"connection_id": "p1", "metric": "duration"}]
+    })
+
+    results, single = await asyncio.gather(
+        service.get_pipeline_metrics_batch(["p1", "p2", "p1"]),
+        service._fetch_status("p1")
+    )
+    assert sorted(calls) == ["p1", "p2"]
+    assert results["p1"]["records_synced"] == 10
+    assert len(results["p1"]["performance_metrics"]["anomalies"]) == 1
+
+    cached = await service.get_pipeline_metrics("p2")
+    assert cached["status"] == "succeeded"
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_pipeline_metrics_batch_reports_errors(service):
+    service.client.check_connection_status = AsyncMock(side_effect=Exception("not found"))
+    service.client.advanced_monitoring = AsyncMock(return_value={"metrics": {}, "anomalies": []})
+    results = await service.get_pipeline_metrics_batch(["missing"])
+    assert results == {"missing": {"error": "not found"}}
+
+@pytest.mark.asyncio
+async def test_created_pipeline_is_served_from_catalog(service):
+    from catalog import WorkspaceCatalog
+    service.catalog = WorkspaceCatalog(service.client, "ws")
+    service.client.create_source.return_value = {"sourceId": "s1", "name": "test_source"}
+    service.client.create_destination.return_value = {"destinationId": "d1", "name": "test_destination"}
+    service.client.create_connection.return_value = {
+        "connectionId": "c1", "name": "test", "sourceId": "s1", "destinationId": "d1", "status": "active"
+    }
+    config = DataServiceConfig(
+        name="test",
+        source_type="postgres",
+        destination_type="snowflake",
+        sync_frequency="daily"
+    )
+    await service.create_data_pipeline(config)
+
+    pipeline = service.get_pipeline("c1")
+    assert pipeline["source"] == {"id": "s1", "name": "test_source"}
+    assert pipeline["destination"]["name"] == "test_destination"
+    assert service.get_pipeline("unknown") is None
+
+@pytest.mark.asyncio
+async def test_failing_pipelines_are_not_tracked(service):
+    healthy = {"p1"}
+
+    async def check_status(pipeline_id, fields=None):
+        if pipeline_id not in healthy:
+            raise Exception("not found")
+        return Mock(status="succeeded", last_sync=None)
+
+    service.client.check_connection_status = check_status
+    service.client.advanced_monitoring = AsyncMock(return_value={"metrics": {}, "anomalies": []})
+    await service.get_pipeline_metrics_batch(["p1", "unknown"])
+    assert service._tracked == {"p1"}
+
+    healthy.clear()
+    for _ in range(service.max_refresh_failures):
+        await service.refresh_pipeline_metrics()
+    assert service._tracked == set()
+    assert "p1" not in service._metrics
+
+@pytest.mark.asyncio
+async def test_unread_pipelines_are_untracked(service):
+    calls = []
+
+    async def check_status(pipeline_id, fields=None):
+        calls.append(pipeline_id)
+        return Mock(status="succeeded", last_sync=None)
+
+    service.client.check_connection_status = check_status
+    service.client.advanced_monitoring = AsyncMock(return_value={"metrics": {}, "anomalies": []})
+    service.rollup_ttl = 60
+    await service.get_pipeline_metrics_batch(["p1", "p2"])
+    service._last_read["p1"] -= 61
+
+    await service.refresh_pipeline_metrics()
+    assert service._tracked == {"p2"}
+    assert "p1" not in service._metrics
+    assert calls[2:] == ["p2"]
+
+@pytest.mark.asyncio
+async def test_unknown_pipeline_is_not_found(service):
+    service.client.check_connection_status = AsyncMock(
+        side_effect=ApiRequestError(404, "API request failed: not found")
+    )
+    service.client.advanced_monitoring = AsyncMock(return_value={"metrics": {}, "anomalies": []})
+    with pytest.raises(PipelineNotFound):
+        await service.get_pipeline_metrics("missing")
+
+@pytest.mark.asyncio
+async def test_pipeline_creation_is_fair_queued():
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+    from airbyte_manage import AirbyteApiClient
+    from fair_queue import current_tenant
+
+    active, peak, created = 0, 0, 0
+
+    async def create(request):
+        nonlocal active, peak, created
+        created += 1
+        number = created
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        kind = request.path.split("/")[1]
+        key = {"sources": "sourceId", "destinations": "destinationId", "connections": "connectionId"}[kind]
+        return web.json_response({key: f"{kind}-{number}"})
+
+    app = web.Application()
+    for kind in ("sources", "destinations", "connections"):
+        app.router.add_post(f"/{kind}/create", create)
+    async with TestServer(app) as server:
+        client = AirbyteApiClient(
+            base_url=str(server.make_url("")).rstrip("/"),
+            username="test",
+            password="test"
+        )
+        service = DataService(
+            client,
+            max_upstream_in_flight=2,
+            tenant_tiers={"small": "basic", "big": "enterprise"}
+        )
+
+        async def provision(tenant, i):
+            current_tenant.set(tenant)
+            return await service.create_data_pipeline(DataServiceConfig(
+                name=f"{tenant}_{i}",
+                source_type="postgres",
+                destination_type="snowflake",
+                sync_frequency="daily"
+            ))
+
+        results = await asyncio.gather(*(
+            provision(tenant, i) for tenant in ("small", "big") for i in range(4)
+        ))
+        await client.session.close()
+
+    assert len({r["pipeline_id"] for r in results}) == 8
+    assert peak <= 2
+    stats = service.request_queue.stats()
+    assert stats["tenants"]["small"]["served"] == 12
+    assert stats["tenants"]["big"]["served"] == 12
+
+@pytest.mark.asyncio
+async def test_tenant_tier_is_not_taken_from_requests(service, tmp_path):
+    from fair_queue import current_tenant
+    current_tenant.set("tenant-a")
+    config = DataServiceConfig(
+        name="test",
+        source_type="postgres",
+        destination_type="snowflake",
+        sync_frequency="daily",
+        pricing_tier="enterprise"
+    )
+    await service.create_data_pipeline(config)
+    assert service.tenant_policy("tenant-a").tier == "basic"
+
+    path = str(tmp_path / "tiers.json")
+    billing = DataService(Mock(), tenant_tiers_path=path)
+    billing.register_tenant("tenant-a", "enterprise")
+    with pytest.raises(ValueError):
+        billing.register_tenant("tenant-a", "platinum")
+    assert DataService(Mock(), tenant_tiers_path=path).tenant_policy("tenant-a").tier == "enterprise"
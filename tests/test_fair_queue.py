@@ -0,0 +1,93 @@
+import pytest
+import asyncio
+from fair_queue import TenantPolicy, WeightedFairQueue, current_tenant, tenant_id
+
+POLICIES = {
+    "small": TenantPolicy("basic", weight=1, max_in_flight=10),
+    "large": TenantPolicy("enterprise", weight=4, max_in_flight=10),
+}
+
+async def _contend(queue, order, per_tenant=10):
+    async def call(tenant):
+        async with queue.slot(tenant):
+            order.append(tenant)
+            await asyncio.sleep(0)
+
+    await queue.acquire("small")
+    calls = asyncio.gather(
+        *[call("large") for _ in range(per_tenant)],
+        *[call("small") for _ in range(per_tenant)]
+    )
+    await asyncio.sleep(0)
+    queue.release("small")
+    await calls
+
+@pytest.mark.asyncio
+async def test_slots_follow_weights_under_contention():
+    queue = WeightedFairQueue(POLICIES.__getitem__, max_in_flight=1)
+    order = []
+    await _contend(queue, order)
+    first = order[:10]
+    assert first.count("large") == 8
+    assert first.count("small") == 2
+    assert queue.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_per_tenant_in_flight_cap():
+    policies = {"t": TenantPolicy("basic", weight=1, max_in_flight=2)}
+    queue = WeightedFairQueue(policies.__getitem__, max_in_flight=10)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with queue.slot("t"):
+            peak = max(peak, queue.stats()["tenants"]["t"]["in_flight"])
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*[call() for _ in range(6)])
+    assert peak == 2
+    assert queue.stats()["tenants"]["t"]["served"] == 6
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    queue = WeightedFairQueue(POLICIES.__getitem__, max_in_flight=1)
+    await queue.acquire("small")
+    waiter = asyncio.ensure_future(queue.acquire("large"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert queue.stats()["tenants"]["large"]["queue_depth"] == 0
+    queue.release("small")
+    assert queue.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_slot_uses_current_tenant():
+    queue = WeightedFairQueue(lambda tenant: POLICIES["small"])
+    current_tenant.set(tenant_id("key-1"))
+    async with queue.slot():
+        pass
+    assert tenant_id("key-1") in queue.stats()["tenants"]
+
+@pytest.mark.asyncio
+async def test_idle_tenants_are_evicted_but_busy_ones_kept():
+    policies = {"busy": TenantPolicy("basic", weight=1, max_in_flight=1)}
+    queue = WeightedFairQueue(
+        lambda t: policies.get(t, TenantPolicy("basic", 1, 10)), max_in_flight=2, max_idle_tenants=2
+    )
+    await queue.acquire("busy")
+    waiter = asyncio.ensure_future(queue.acquire("busy"))
+    await asyncio.sleep(0)
+
+    for i in range(10):
+        async with queue.slot(f"t{i}"):
+            pass
+    tenants = queue.stats()["tenants"]
+    assert set(tenants) == {"busy", "t8", "t9"}
+    assert tenants["busy"]["queue_depth"] == 1
+
+    queue.release("busy")
+    await waiter
+    queue.release("busy")
+    assert set(queue.stats()["tenants"]) == {"t9", "busy"}
+    assert queue.in_flight == 0 and queue.waiting == 0
@@ -0,0 +1,110 @@
+import gzip
+import json
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+from frontend.assets import (
+    IMMUTABLE_CACHE_CONTROL, AssetManifest, PrecompressedStaticFiles, build_assets
+)
+import frontend.app
+import run
+from run import server_options
+
+CSS = "body { color: #333; }\n" * 200
+
+def _static(tmp_path):
+    static = tmp_path / "static"
+    (static / "css").mkdir(parents=True)
+    (static / "css" / "style.css").write_text(CSS)
+    return static
+
+def test_build_assets_hashes_and_precompresses(tmp_path):
+    static = _static(tmp_path)
+    manifest = build_assets(static)
+    hashed = manifest["css/style.css"]
+    assert hashed.startswith("css/style.") and hashed.endswith(".css")
+    dist = static / "dist"
+    assert (dist / hashed).read_text() == CSS
+    assert gzip.decompress((dist / (hashed + ".gz")).read_bytes()).decode() == CSS
+    assert json.loads((dist / "manifest.json").read_text()) == manifest
+    # Rebuilding does not pick up its own output
+    assert build_assets(static) == manifest
+
+def test_asset_manifest_urls(tmp_path):
+    static = _static(tmp_path)
+    manifest = build_assets(static)
+    assets = AssetManifest(static / "dist", enabled=True)
+    assert assets.url("css/style.css") == "/static/dist/" + manifest["css/style.css"]
+    assert assets.url("js/missing.js") == "/static/js/missing.js"
+    assert AssetManifest(static / "dist", enabled=False).url("css/style.css") == "/static/css/style.css"
+
+def test_asset_manifest_follows_profile_set_after_import(tmp_path, monkeypatch):
+    static = _static(tmp_path)
+    build_assets(static)
+    monkeypatch.setenv("APP_ENV", "development")
+    assets = AssetManifest(static / "dist")
+    monkeypatch.setenv("APP_ENV", "production")
+    assert assets.url("css/style.css").startswith("/static/dist/css/style.")
+
+def test_precompressed_static_files(tmp_path):
+    static = _static(tmp_path)
+    hashed = build_assets(static)["css/style.css"]
+    app = Starlette(routes=[Mount("/static", PrecompressedStaticFiles(directory=str(static)))])
+    client = TestClient(app)
+
+    response = client.get(f"/static/dist/{hashed}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.text == CSS
+
+    etag = response.headers["etag"]
+    response = client.get(
+        f"/static/dist/{hashed}",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    response = client.get(f"/static/dist/{hashed}", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.text == CSS
+
+    # Unhashed paths keep revalidating
+    response = client.get("/static/css/style.css")
+    assert "cache-control" not in response.headers
+
+def test_server_options_profiles():
+    assert server_options(False, 4, "127.0.0.1", 8000)["reload"] is True
+    options = server_options(True, 4, "127.0.0.1", 8000)
+    assert "reload" not in options
+    assert options["workers"] == 4
+    assert options["loop"] in ("uvloop", "asyncio")
+    assert options["http"] in ("httptools", "h11")
+
+def test_single_worker_production_serves_hashed_assets(tmp_path, monkeypatch):
+    static = _static(tmp_path)
+    monkeypatch.setenv("APP_ENV", "development")
+    monkeypatch.setattr(frontend.app.assets, "dist_dir", static / "dist")
+    monkeypatch.setattr(frontend.app.assets, "_entries", None)
+    monkeypatch.setattr(run, "build_assets", lambda: build_assets(static))
+    served = {}
+
+    def serve(app, **options):
+        # With one worker uvicorn reuses the frontend app imported by run.py
+        served.update(options, html=TestClient(frontend.app.app).get("/").text)
+
+    monkeypatch.setattr(run.uvicorn, "run", serve)
+    run.main(["--production", "--workers", "1"])
+    assert served["workers"] == 1
+    assert "reload" not in served
+    assert "/static/dist/css/style." in served["html"]
+
+def test_production_defaults_to_one_worker(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setenv("APP_ENV", "development")
+    monkeypatch.setattr(run, "build_assets", lambda: {})
+    served = {}
+    monkeypatch.setattr(run.uvicorn, "run", lambda app, **options: served.update(options))
+    run.main(["--production"])
+    assert served["workers"] == 1
@@ -0,0 +1,102 @@
+import pytest
+import inspect
+import pickle
+import queue
+import time
+from datetime import datetime
+import sharded_sync
+from airbyte_manage import AirbyteApiClient, SyncJob
+from sharded_sync import SharedRateBudget, shard_connection_ids, iter_sharded_bulk_sync, _collect_results
+from sync_notifications import SyncNotification
+
+def test_shard_connection_ids():
+    shards = shard_connection_ids(["c1", "c2", "c3", "c4", "c5"], 2)
+    assert shards == [["c1", "c3", "c5"], ["c2", "c4"]]
+    assert shard_connection_ids(["c1"], 4) == [["c1"]]
+
+@pytest.mark.asyncio
+async def test_shared_rate_budget_spacing():
+    budget = SharedRateBudget(rate_per_second=50)
+    start = time.monotonic()
+    for _ in range(6):
+        await budget.acquire()
+    assert time.monotonic() - start >= 5 * budget.interval * 0.9
+
+def test_sharded_sync_accounts_for_every_connection():
+    connection_ids = [f"conn{i}" for i in range(6)]
+    jobs = list(iter_sharded_bulk_sync(
+        connection_ids,
+        processes=2,
+        client_kwargs={"base_url": "http://127.0.0.1:9", "username": "u", "password": "p"}
+    ))
+    assert sorted(job.connection_id for job in jobs) == connection_ids
+    assert all(job.status == "ERROR" for job in jobs)
+
+class _ExitedWorker:
+    exitcode = 0
+
+    def is_alive(self):
+        return False
+
+    def join(self):
+        pass
+
+class _RacingQueue:
+    """The worker's results land just after the blocking get times out."""
+
+    def __init__(self, events):
+        self.events = list(events)
+
+    def get(self, timeout=None):
+        raise queue.Empty
+
+    def get_nowait(self):
+        if not self.events:
+            raise queue.Empty
+        return self.events.pop(0)
+
+def test_results_flushed_before_worker_exit_are_kept():
+    now = datetime.utcnow()
+    job = SyncJob(connection_id="conn1", status="SUCCEEDED", start_time=now, end_time=now)
+    results = _RacingQueue([(1, job), (1, None)])
+    jobs = list(_collect_results(results, {1: (_ExitedWorker(), {"conn1"})}))
+    assert [(j.connection_id, j.status) for j in jobs] == [("conn1", "SUCCEEDED")]
+
+def test_worker_exiting_without_reporting_fails_its_ids():
+    jobs = list(_collect_results(_RacingQueue([]), {1: (_ExitedWorker(), {"conn1"})}))
+    assert [(j.connection_id, j.status) for j in jobs] == [("conn1", "ERROR")]
+
+@pytest.mark.asyncio
+async def test_sharded_bulk_sync_workers_match_the_client(monkeypatch):
+    client = AirbyteApiClient(
+        base_url="http://test", username="u", password="p",
+        fast_decoding=True, compress_requests_over=1024, webhook_timeout=30.0
+    )
+    seen = {}
+
+    def fake_sharded(connection_ids, client_kwargs, router, **options):
+        seen["kwargs"] = client_kwargs
+        seen["queue"] = router.add_shard(connection_ids)
+        seen["routed"] = router.publish in client.sync_notifications._subscribers
+        now = datetime.utcnow()
+        return [SyncJob(c, "SUCCEEDED", now, now) for c in connection_ids]
+
+    monkeypatch.setattr(sharded_sync, "iter_sharded_bulk_sync", fake_sharded)
+    async with client:
+        jobs = await client.sharded_bulk_sync(["c1", "c2"], processes=2)
+        assert [j.connection_id for j in jobs] == ["c1", "c2"]
+
+        kwargs = seen["kwargs"]
+        assert kwargs["fast_decoding"] is True
+        assert kwargs["compress_requests_over"] == 1024
+        assert kwargs["webhook_timeout"] == 30.0
+        # Everything but the process-local hooks is forwarded, and survives pickling
+        options = set(inspect.signature(AirbyteApiClient).parameters)
+        assert options - set(kwargs) == {"rate_limiter", "request_queue"}
+        pickle.dumps(kwargs)
+
+        # Webhooks reach the workers while they run, and not after
+        assert seen["routed"]
+        client.sync_notifications.publish(SyncNotification("c1", "SUCCEEDED", job_id="1"))
+        with pytest.raises(queue.Empty):
+            seen["queue"].get(timeout=0.1)
@@ -0,0 +1,152 @@
+import pytest
+import asyncio
+import socket
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import cli
+from airbyte_manage import AirbyteApiClient
+from sync_notifications import (
+    SyncNotification, SyncNotificationHub, WebhookEmitter, parse_notification, sign_payload,
+    verify_signature,
+)
+
+def test_verify_signature():
+    body = b'{"connectionId": "conn1"}'
+    assert verify_signature(body, "secret", signature=sign_payload(body, "secret"))
+    assert verify_signature(body, "secret", token="secret")
+    assert not verify_signature(body, "secret", signature=sign_payload(body, "other"))
+    assert not verify_signature(body, "secret")
+
+def test_parse_airbyte_payload():
+    notification = parse_notification({
+        "data": {"connection": {"id": "conn1"}, "jobId": 7, "success": False, "recordsCommitted": 12}
+    })
+    assert notification.connection_id == "conn1"
+    assert notification.status == "FAILED"
+    assert notification.job_id == "7"
+    assert notification.records_synced == 12
+
+@pytest.mark.asyncio
+async def test_hub_resolves_and_deduplicates():
+    hub = SyncNotificationHub()
+    waiter = hub.register("conn1", job_id=7)
+    other_job = SyncNotification("conn1", "SUCCEEDED", job_id="6")
+    assert hub.publish(other_job) == 0
+    assert not waiter.done()
+
+    notification = SyncNotification("conn1", "SUCCEEDED", job_id="7", records_synced=5)
+    assert hub.publish(notification) == 1
+    assert hub.publish(SyncNotification("conn1", "SUCCEEDED", job_id="7")) is None
+    assert (await waiter).records_synced == 5
+    assert hub.pending() == 0
+
+@pytest.mark.asyncio
+async def test_hub_keeps_repeated_job_less_notifications():
+    hub = SyncNotificationHub()
+    first = hub.register("conn1", since=datetime.utcnow())
+    assert hub.publish(SyncNotification("conn1", "SUCCEEDED")) == 1
+    assert first.done()
+
+    second = hub.register("conn1", since=datetime.utcnow())
+    assert not second.done()
+    assert hub.publish(SyncNotification("conn1", "SUCCEEDED")) == 1
+    assert second.done()
+
+@pytest.mark.asyncio
+async def test_hub_resolves_late_registration():
+    hub = SyncNotificationHub()
+    since = datetime.utcnow() - timedelta(seconds=1)
+    hub.publish(SyncNotification("conn1", "SUCCEEDED"))
+    assert hub.register("conn1", since=since).done()
+    assert not hub.register("conn1", since=datetime.utcnow() + timedelta(seconds=1)).done()
+
+@pytest.mark.asyncio
+async def test_wait_for_sync_completion_uses_webhook():
+    client = AirbyteApiClient(base_url="http://test", username="test", password="test", webhook_timeout=5)
+    client.check_connection_status = AsyncMock()
+    waiter = asyncio.ensure_future(client._wait_for_sync_completion("conn1", job_id=1))
+    await asyncio.sleep(0)
+    client.sync_notifications.publish(SyncNotification("conn1", "SUCCEEDED", job_id="1", records_synced=3))
+    result = await waiter
+    assert result["status"] == "SUCCEEDED"
+    assert result["latest_status"]["recordsSynced"] == 3
+    client.check_connection_status.assert_not_called()
+    await client.session.close()
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class _Jobs(list):
+    record = list.append
+
+@asynccontextmanager
+async def airbyte_with_webhooks(monkeypatch, receiver_url):
+    """Stand-in Airbyte that reports every triggered sync by webhook only."""
+    status_gets = []
+    emitter = WebhookEmitter(receiver_url, "secret")
+
+    async def trigger(request):
+        connection_id = (await request.json())["connectionId"]
+        job_id = int(connection_id[len("conn"):]) + 100
+
+        async def complete():
+            # Retry until the receiver (possibly still starting) accepts it
+            for _ in range(100):
+                await asyncio.sleep(0.05)
+                try:
+                    await emitter.emit(connection_id, job_id=job_id, records_synced=7)
+                    return
+                except OSError:
+                    continue
+
+        asyncio.ensure_future(complete())
+        return web.json_response({"job": {"id": job_id}})
+
+    async def get_status(request):
+        status_gets.append(request)
+        return web.json_response({"status": "SUCCEEDED", "last_sync": None, "latest_status": {}})
+
+    app = web.Application()
+    app.router.add_post("/connections/sync", trigger)
+    app.router.add_post("/connections/get", get_status)
+    async with TestServer(app) as server:
+        monkeypatch.setenv("AIRBYTE_BASE_URL", str(server.make_url("")).rstrip("/"))
+        monkeypatch.setenv("BASIC_AUTH_USERNAME", "test")
+        monkeypatch.setenv("BASIC_AUTH_PASSWORD", "test")
+        yield status_gets
+
+@pytest.mark.asyncio
+async def test_cli_bulk_sync_finishes_on_webhook(monkeypatch):
+    port = _free_port()
+    receiver = {"secret": "secret", "host": "127.0.0.1", "port": port}
+    url = f"http://127.0.0.1:{port}/webhooks/airbyte/sync"
+    async with airbyte_with_webhooks(monkeypatch, url) as status_gets:
+        jobs = _Jobs()
+        await asyncio.wait_for(cli._run_bulk_sync(
+            ["conn1", "conn2"], 2, 100.0, jobs, webhook_timeout=30, receiver=receiver
+        ), 10)
+    assert sorted((j.connection_id, j.status, j.records_synced) for j in jobs) == [
+        ("conn1", "SUCCEEDED", 7), ("conn2", "SUCCEEDED", 7)
+    ]
+    assert status_gets == []
+
+@pytest.mark.asyncio
+async def test_sharded_cli_bulk_sync_routes_webhooks_to_workers(monkeypatch):
+    port = _free_port()
+    receiver = {"secret": "secret", "host": "127.0.0.1", "port": port}
+    url = f"http://127.0.0.1:{port}/webhooks/airbyte/sync"
+    async with airbyte_with_webhooks(monkeypatch, url) as status_gets:
+        jobs = _Jobs()
+        await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(
+            None, cli._run_sharded_bulk_sync,
+            ["conn1", "conn2", "conn3"], 2, 2, 100.0, jobs, 30, receiver
+        ), 60)
+    assert sorted((j.connection_id, j.status) for j in jobs) == [
+        ("conn1", "SUCCEEDED"), ("conn2", "SUCCEEDED"), ("conn3", "SUCCEEDED")
+    ]
+    assert status_gets == []
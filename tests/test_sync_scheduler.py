@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+from airbyte_manage import SyncJob
+from sync_scheduler import (
+    ConnectionProfile, LoadAwareScheduler, SyncHistory, cron_expression,
+    parse_period_minutes,
+)
+
+def _hourly(count, duration=300):
+    return [ConnectionProfile(f"conn{i}", 60, duration) for i in range(count)]
+
+def test_plan_staggers_hourly_connections():
+    scheduler = LoadAwareScheduler(max_concurrent_syncs=2)
+    plan = scheduler.plan(_hourly(12))
+    assert plan["before"]["peak_concurrent_syncs"] == 12
+    assert plan["after"]["peak_concurrent_syncs"] == 1
+    assert plan["within_caps"]
+    assert len({s["offset_minutes"] for s in plan["schedules"]}) == 12
+
+def test_plan_reports_over_capacity():
+    plan = LoadAwareScheduler(max_concurrent_syncs=1).plan(_hourly(3, duration=1800))
+    assert plan["after"]["peak_concurrent_syncs"] == 2
+    assert not plan["within_caps"]
+
+def test_daily_window_and_skipped_periods():
+    scheduler = LoadAwareScheduler(daily_window=(120, 240))
+    plan = scheduler.plan([
+        ConnectionProfile("nightly", 1440, 600),
+        ConnectionProfile("odd", 90, 60),
+    ])
+    assert plan["skipped"] == ["odd"]
+    assert 120 <= plan["schedules"][0]["offset_minutes"] < 240
+
+def test_cron_expression():
+    assert cron_expression(60, 7) == "0 7 * * * ?"
+    assert cron_expression(15, 3) == "0 3/15 * * * ?"
+    assert cron_expression(120, 67) == "0 7 1/2 * * ?"
+    assert cron_expression(1440, 125) == "0 5 2 * * ?"
+
+def test_parse_period_minutes():
+    connection = {"scheduleType": "basic", "scheduleData": {"basicSchedule": {"timeUnit": "hours", "units": 2}}}
+    assert parse_period_minutes(connection) == 120
+    assert parse_period_minutes({"scheduleType": "manual"}) is None
+
+def test_sync_history_ewma():
+    history = SyncHistory(alpha=0.5)
+    start = datetime(2024, 1, 1)
+    history.observe_job(SyncJob("conn1", "SUCCEEDED", start, start + timedelta(seconds=100), 10))
+    history.observe_job(SyncJob("conn1", "SUCCEEDED", start, start + timedelta(seconds=200), 30))
+    assert history.get("conn1") == (150.0, 20.0, 2)